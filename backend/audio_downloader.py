@@ -2,7 +2,7 @@ import os
 import requests
 from dotenv import load_dotenv
 from pathlib import Path
-from support_scripts.manifesto import load_manifest, update_stage
+from support_scripts.manifesto import bases_where, load_manifest, update_stage
 from support_scripts.paths import AUDIO_OUTPUT_DIR
 
 # --- 1. Configuração ---
@@ -39,13 +39,12 @@ def main():
         return
 
     # 1. Load Manifest and Filter Pending Downloads
-    mf = load_manifest()
+    candidates = bases_where(audio="done", audio_downloaded__ne="done")
+    mf = load_manifest() if candidates else {}
     pending_downloads = {
-        base: info.get("audio_id") 
-        for base, info in mf.items() 
-        if info.get("audio") == "done" 
-        and info.get("audio_downloaded") != "done" 
-        and info.get("audio_id")
+        base: mf[base].get("audio_id")
+        for base in candidates
+        if base in mf and mf[base].get("audio_id")
     }
 
     if not pending_downloads:
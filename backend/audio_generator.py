@@ -4,7 +4,7 @@ import json
 import requests
 from dotenv import load_dotenv
 from pathlib import Path
-from support_scripts.manifesto import load_manifest, update_stage
+from support_scripts.manifesto import bases_where, manifest_session, update_stage
 from support_scripts.paths import TXT_INBOX_DIR
 
 # --- 1. Configuração e Carregamento de Variáveis de Ambiente ---
@@ -85,8 +85,7 @@ def main():
     check_balance(BASE_URL, headers)
 
     # 1. Load Manifest and Filter Pending
-    mf = load_manifest()
-    pending_bases = [b for b, info in mf.items() if info.get("audio") == "pending" and info.get("txt") == "done"]
+    pending_bases = bases_where(audio="pending", txt="done")
 
     if not pending_bases:
         print("📭 No bases with 'audio: pending' found.")
@@ -118,41 +117,50 @@ def main():
             return
 
     # 3. Process Selected Items
-    for base_name in bases_to_process:
-        print(f"\n🚀 Processing: {base_name}")
-
-        # Read and Clean Text
-        txt_path = TXT_INBOX_DIR / f"{base_name}.txt"
-        if not txt_path.exists():
-            print(f"❌ Text file not found: {txt_path}")
-            continue
-
-        raw_text = txt_path.read_text(encoding="utf-8")
-        cleaned_text = clean_text(raw_text)
-
-        if not cleaned_text:
-            print("❌ Text is empty after cleaning.")
-            continue
-
-        print(f"📝 Cleaned text (first 100 chars): {cleaned_text[:100]}...")
-
-        # Send to API
-        payload = {
-            "input": cleaned_text,
-            "voice_id": VOICE_ID,
-            "model_id": MODEL_ID,
-            "speed": SPEED
-        }
-        
-        post_url = f"{BASE_URL}/labs/task"
-        task_id = create_task(post_url, headers, payload)
-
-        # Update Manifest
-        if task_id:
-            update_stage(base_name, "audio", "done", extra={"audio_id": task_id, "audio_downloaded": "pending"})
-            print(f"✅ Manifest updated for {base_name}: audio=done, audio_id={task_id}")
-        else:
-            print("⚠️ Audio generation failed. Manifest not updated.")
+    # Each created task id goes into the manifest session right away; the session
+    # flushes periodically and on exit (also on Ctrl+C / SIGTERM), so paid tasks are never lost.
+    recorded = 0
+    with manifest_session():
+        try:
+            for base_name in bases_to_process:
+                print(f"\n🚀 Processing: {base_name}")
+
+                # Read and Clean Text
+                txt_path = TXT_INBOX_DIR / f"{base_name}.txt"
+                if not txt_path.exists():
+                    print(f"❌ Text file not found: {txt_path}")
+                    continue
+
+                raw_text = txt_path.read_text(encoding="utf-8")
+                cleaned_text = clean_text(raw_text)
+
+                if not cleaned_text:
+                    print("❌ Text is empty after cleaning.")
+                    continue
+
+                print(f"📝 Cleaned text (first 100 chars): {cleaned_text[:100]}...")
+
+                # Send to API
+                payload = {
+                    "input": cleaned_text,
+                    "voice_id": VOICE_ID,
+                    "model_id": MODEL_ID,
+                    "speed": SPEED
+                }
+
+                post_url = f"{BASE_URL}/labs/task"
+                task_id = create_task(post_url, headers, payload)
+
+                # Queue Manifest Update
+                if task_id:
+                    update_stage(base_name, "audio", "done", {"audio_id": task_id, "audio_downloaded": "pending"})
+                    recorded += 1
+                    print(f"✅ Manifest updated for {base_name}: audio=done, audio_id={task_id}")
+                else:
+                    print("⚠️ Audio generation failed. Manifest not updated.")
+        finally:
+            if recorded:
+                print(f"🧾 Manifest updated for {recorded} base(s).")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
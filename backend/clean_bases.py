@@ -1,9 +1,8 @@
-import json
 import shutil
 import os
 from pathlib import Path
+from support_scripts.manifesto import delete_entries, load_manifest as _load_manifest
 from support_scripts.paths import (
-    MANIFEST_PATH,
     VIDEO_OUTPUT_DIR,
     IMG_OUTPUT_DIR,
     RENDER_OUTPUT_DIR,
@@ -83,26 +82,18 @@ def clean_by_pattern(target_name):
                 delete_path(file_path)
 
 def load_manifest():
-    """Loads the manifest and returns the dictionary."""
-    if not MANIFEST_PATH.exists():
-        print("⚠️ Manifest not found, creating new empty one.")
-        MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
-        MANIFEST_PATH.write_text("{}", encoding="utf-8")
-        return {}
+    """Loads the manifest (archived bases included) and returns the dictionary."""
     try:
-        return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+        return _load_manifest(include_archived=True)
     except Exception as e:
         print(f"⚠️ Error reading manifest: {e}")
         return {}
 
-def save_manifest(data):
-    """Saves the updated manifest."""
+def remove_from_manifest(bases):
+    """Drops the cleaned bases from the manifest (locked, leaves other entries untouched)."""
     try:
-        MANIFEST_PATH.write_text(
-            json.dumps(data, indent=2, ensure_ascii=False),
-            encoding="utf-8"
-        )
-        print(f"🧾 Manifest updated: {MANIFEST_PATH}")
+        removed = delete_entries(bases)
+        print(f"🧾 Manifest updated: {removed} entr{'y' if removed == 1 else 'ies'} removed")
     except Exception as e:
         print(f"⚠️ Failed to save manifest: {e}")
 
@@ -213,10 +204,8 @@ def main():
 
     for video_name in selected_videos:
         clean_video_files(video_name)
-        if video_name in manifest_data:
-            del manifest_data[video_name]
 
-    save_manifest(manifest_data)
+    remove_from_manifest(selected_videos)
     
     if is_full_clean:
         purge_output_except_txt_processed()
@@ -8,11 +8,12 @@ It reads configuration from .env and processes tasks from manifesto.json.
 
 import os
 import re
-import json
 import requests
 from pathlib import Path
 from dotenv import load_dotenv
 
+from support_scripts.manifesto import load_manifest, update_stage
+
 # Load environment variables
 # Explicitly look for .env in the same directory as this script
 ENV_PATH = Path(__file__).resolve().parent / ".env"
@@ -24,7 +25,6 @@ load_dotenv(dotenv_path=ENV_PATH)
 
 # Paths
 BASE_DIR = Path(__file__).resolve().parent.parent
-MANIFEST_PATH = BASE_DIR / "manifesto.json"
 TXT_INBOX_DIR = BASE_DIR / "txt_inbox"
 
 # API Configuration
@@ -117,25 +117,6 @@ def generate_audio(api_key: str, text: str, voice_id: str, speed: float, pitch:
             "error": str(e)
         }
 
-def load_manifest():
-    if not MANIFEST_PATH.exists():
-        print(f"❌ Manifest file not found at {MANIFEST_PATH}")
-        return {}
-    try:
-        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"❌ Error loading manifest: {e}")
-        return {}
-
-def save_manifest(data):
-    try:
-        with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print("💾 Manifest updated.")
-    except Exception as e:
-        print(f"❌ Error saving manifest: {e}")
-
 def main():
     print("=" * 70)
     print("GenAI Pro Audio Generator - Batch Processor")
@@ -167,13 +148,13 @@ def main():
         print(f"   ⚠️  Could not fetch balance: {balance_result['error']}")
     
     # Load Manifest
-    manifest = load_manifest()
-    if not manifest:
+    try:
+        manifest = load_manifest()
+    except Exception as e:
+        print(f"❌ Error loading manifest: {e}")
         return
-
-    # Load Manifest
-    manifest = load_manifest()
     if not manifest:
+        print("❌ Manifest is empty or missing.")
         return
 
     print(f"\n📋 Scanning manifesto.json for pending audio tasks...")
@@ -225,8 +206,6 @@ def main():
         return
 
     # Process selected projects
-    updates_made = False
-    
     for project_name in projects_to_process:
         print(f"\n🎬 Processing: {project_name}")
         data = manifest[project_name]
@@ -263,17 +242,12 @@ def main():
             task_id = result["task_id"]
             print(f"   ✅ Started! Task ID: {task_id}")
             
-            # Update manifest
-            manifest[project_name]["audio_id"] = task_id
-            manifest[project_name]["audio"] = "done"
-            manifest[project_name]["audio_downloaded"] = "pending"
-            updates_made = True
+            # Update manifest (locked, per entry)
+            update_stage(project_name, "audio", "done", extra={"audio_id": task_id, "audio_downloaded": "pending"})
+            print("💾 Manifest updated.")
         else:
             print(f"   ❌ Failed: {result['error']}")
 
-    if updates_made:
-        save_manifest(manifest)
-    
     print("\n" + "=" * 70)
 
 if __name__ == "__main__":
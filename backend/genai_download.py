@@ -7,12 +7,13 @@ It reads configuration from .env and processes tasks from manifesto.json.
 """
 
 import os
-import json
 import requests
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
 
+from support_scripts.manifesto import load_manifest, update_stage
+
 # Load environment variables
 # Explicitly look for .env in the same directory as this script
 ENV_PATH = Path(__file__).resolve().parent / ".env"
@@ -24,7 +25,6 @@ load_dotenv(dotenv_path=ENV_PATH)
 
 # Paths
 BASE_DIR = Path(__file__).resolve().parent.parent
-MANIFEST_PATH = BASE_DIR / "manifesto.json"
 OUTPUT_DIR = BASE_DIR / "output" / "audio"
 
 # API Configuration
@@ -101,25 +101,6 @@ def format_size(size_bytes: int) -> str:
         size_bytes /= 1024.0
     return f"{size_bytes:.2f} TB"
 
-def load_manifest():
-    if not MANIFEST_PATH.exists():
-        print(f"❌ Manifest file not found at {MANIFEST_PATH}")
-        return {}
-    try:
-        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"❌ Error loading manifest: {e}")
-        return {}
-
-def save_manifest(data):
-    try:
-        with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print("💾 Manifest updated.")
-    except Exception as e:
-        print(f"❌ Error saving manifest: {e}")
-
 def main():
     print("=" * 70)
     print("GenAI Pro Audio Downloader - Batch Processor")
@@ -138,13 +119,13 @@ def main():
     print(f"\n📁 Output directory: {OUTPUT_DIR.absolute()}")
     
     # Load Manifest
-    manifest = load_manifest()
-    if not manifest:
+    try:
+        manifest = load_manifest()
+    except Exception as e:
+        print(f"❌ Error loading manifest: {e}")
         return
-
-    # Load Manifest
-    manifest = load_manifest()
     if not manifest:
+        print("❌ Manifest is empty or missing.")
         return
 
     print(f"\n📋 Scanning manifesto.json for pending downloads...")
@@ -194,8 +175,6 @@ def main():
         return
 
     # Process selected projects
-    updates_made = False
-    
     for project_name in projects_to_process:
         print(f"\n🎬 Project: {project_name}")
         data = manifest[project_name]
@@ -234,14 +213,9 @@ def main():
                 file_size = format_size(download_result["size"])
                 print(f"   ✅ Downloaded: {filename} ({file_size})")
                 
-                # Update manifest
-                manifest[project_name]["audio_downloaded"] = "done"
-                manifest[project_name]["audio"] = "done"
-                
-                rel_path = output_path.relative_to(BASE_DIR)
-                manifest[project_name]["audio_file"] = str(rel_path)
-                
-                updates_made = True
+                # Update manifest (locked, per entry; audio_file is stored project-relative)
+                update_stage(project_name, "audio_downloaded", "done", extra={"audio": "done", "audio_file": str(output_path)})
+                print("💾 Manifest updated.")
             else:
                 print(f"   ❌ Download failed: {download_result['error']}")
         
@@ -251,9 +225,6 @@ def main():
         else:
             print(f"   ❌ Task failed or has unknown status: {status}")
     
-    if updates_made:
-        save_manifest(manifest)
-    
     print("\n" + "=" * 70)
 
 if __name__ == "__main__":
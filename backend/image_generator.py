@@ -1,18 +1,18 @@
 # generate_images_pw.py — auto-perfis pelos arquivos de sugestão
 from tqdm import tqdm
 import json
+import os
 import asyncio
 import base64
 import random
-import time
 from pathlib import Path
 from typing import List, Dict
 from playwright.async_api import async_playwright, TimeoutError as PWTimeout
 from collections import defaultdict
 from support_scripts.alerts import ring_bell
 from profiles import list_profiles, resolve_user_data_dir
-from support_scripts.paths import MANIFEST_PATH, IMG_SUGGESTIONS_DIR, IMG_OUTPUT_DIR
-from support_scripts.manifesto import load_manifest, save_manifest
+from support_scripts.paths import IMG_SUGGESTIONS_DIR, IMG_OUTPUT_DIR
+from support_scripts.manifesto import bases_where, has_entry, manifest_session, update_entry
 import sys
 
 # ====== PASTAS / CONSTANTES ======
@@ -104,13 +104,15 @@ def report_errors(base: str):
     ALL_ERRORS.clear()
 
 
-def set_images_status(mf: dict, base: str, status: str, images_saved: int | None = None):
-    entry = mf.setdefault(base, {})
-    entry["images"] = status
-    if images_saved is not None:
-        entry["images_saved"] = images_saved
-    entry["last_update"] = time.strftime("%Y-%m-%dT%H:%M:%S")
-    save_manifest(mf)
+def set_images_status(base: str, status: str, images_saved: int | None = None, at_least: bool = False):
+    """Locked read-modify-write of the images stage (at_least keeps the highest images_saved)."""
+    def _apply(entry):
+        entry["images"] = status
+        if images_saved is not None:
+            current = int(entry.get("images_saved") or 0)
+            entry["images_saved"] = max(current, images_saved) if at_least else images_saved
+
+    update_entry(base, _apply)
 
 
 async def ask_retry_decision(base: str, profile: str, failed_ids: list[int]) -> bool:
@@ -156,12 +158,14 @@ def parse_profile_suggestions(base: str) -> Dict[str, Dict[int, str]]:
 
 
 def list_pending_bases_from_manifest() -> List[str]:
-    mf = load_manifest()
-    pending_bases = [b for b, info in mf.items() if info.get("suggestions") == 'done' and info.get("images") != 'done']
+    pending_bases = bases_where(suggestions="done", images__ne="done")
 
-    for subdir in SUGGESTIONS_DIR.iterdir():
-        if subdir.is_dir() and subdir.name not in mf:
-            pending_bases.append(subdir.name)
+    # Suggestion folders that never got a manifest entry (e.g. created by hand).
+    if SUGGESTIONS_DIR.exists():
+        with os.scandir(SUGGESTIONS_DIR) as it:
+            for item in it:
+                if item.is_dir() and not has_entry(item.name):
+                    pending_bases.append(item.name)
 
     seen, unique = set(), []
     for b in pending_bases:
@@ -277,10 +281,7 @@ async def worker_task(worker_id: int, context, base: str, profile: str,
             b64_list = await send_prompt_and_collect(page, prompt, timeout_ms=90000)
             if b64_list:
                 save_scene_images(base, idx, b64_list)
-                # direct manifest update — no lock
-                mf = load_manifest()
-                current = int(mf.get(base, {}).get("images_saved") or 0)
-                set_images_status(mf, base, "in_progress", images_saved=max(current, idx))
+                set_images_status(base, "in_progress", images_saved=idx, at_least=True)
             pbar.update(1)
             # Send JSON progress to frontend
             try:
@@ -401,20 +402,20 @@ async def run_for_base_with_profiles(pw, base: str, workers_per_profile: int, he
                 print(f"✅ {base} / profile '{profile}': already completed, will not be opened.")
 
         if not pending_chosen:
-            mf_final = load_manifest()
             all_scene_ids = sorted({sid for _, m in chosen for sid in m.keys()})
             total = max(all_scene_ids) if all_scene_ids else 0
-            set_images_status(mf_final, base, "done", images_saved=total)
+            set_images_status(base, "done", images_saved=total)
             print(f"🏁 {base}: nothing pending in any profile. Marked as done.")
             return
 
-        mf = load_manifest()
-        if base not in mf:
-            mf[base] = {"images": "in_progress", "images_saved": 0}
-            save_manifest(mf)
-        elif mf[base].get("images") not in ("pending", "in_progress"):
-            mf[base]["images"] = "in_progress"
-            save_manifest(mf)
+        def _mark_started(entry):
+            if "images" not in entry:
+                entry["images"] = "in_progress"
+                entry["images_saved"] = 0
+            elif entry.get("images") not in ("pending", "in_progress"):
+                entry["images"] = "in_progress"
+
+        update_entry(base, _mark_started)
 
         # === STEP 1: open only profiles with pending items ===
         for idx, (profile, scene_map) in enumerate(pending_chosen):
@@ -543,13 +544,12 @@ async def run_for_base_with_profiles(pw, base: str, workers_per_profile: int, he
             return
         total = max(all_scene_ids)
         restam = [sid for sid in all_scene_ids if not is_scene_complete(base, sid)]
-        mf_final = load_manifest()
         if not restam:
-            set_images_status(mf_final, base, "done", images_saved=total)
+            set_images_status(base, "done", images_saved=total)
             print(f"\n🏁 Completed: {base} ({total}/{total})")
         else:
             maior = max([sid for sid in all_scene_ids if is_scene_complete(base, sid)], default=0)
-            set_images_status(mf_final, base, "in_progress", images_saved=maior)
+            set_images_status(base, "in_progress", images_saved=maior)
             print(f"\n⏸️ Partial: {base} (missing {len(restam)} scenes) — keeping 'in_progress'")
     finally:
         for ctx in profile_contexts.values():
@@ -611,9 +611,11 @@ async def main():
         if headless_raw in ("n", "no", "false", "0"):
             headless = False
 
-        async with async_playwright() as pw:
-            for base in selected:
-                await run_for_base_with_profiles(pw, base, workers_per_profile, headless)
+        # Per-scene progress is batched: one manifest write every few seconds, not per image.
+        with manifest_session(flush_interval=5.0, flush_every=25):
+            async with async_playwright() as pw:
+                for base in selected:
+                    await run_for_base_with_profiles(pw, base, workers_per_profile, headless)
     finally:
         ring_bell("✅ Finished processing selected bases.")
 
@@ -1,17 +1,34 @@
 # make_and_render.py (OpenCV, com ajuste automático de duração por imagem + seleção manual)
 import json
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import tempfile
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
 from typing import Tuple, Optional
 import cv2
 import numpy as np
 
-from support_scripts.manifesto import load_manifest, update_stage
+from support_scripts.manifesto import auto_archive, bases_where, get_entry, manifest_session, update_stage, update_stages
 from support_scripts.alerts import ring_bell
+from support_scripts.captions import cue_overlay, read_cues
+from support_scripts.ffmpeg_tools import find_ffmpeg, mux_audio, run_ffmpeg, write_concat_list
+from support_scripts.media_info import image_size, mp3_duration, mp4_duration
+from support_scripts.segment_cache import SegmentCache, file_digest
 from support_scripts.paths import (
+    AUDIO_OUTPUT_DIR,
     SRT_OUTPUT_DIR,
     TIMELINES_DIR,
     IMG_OUTPUT_DIR,
+    RENDER_CACHE_DIR,
     RENDER_OUTPUT_DIR,
+    RENDER_PREVIEW_DIR,
 )
 
 # ======================
@@ -22,9 +39,130 @@ TIMELINE_DIR   = TIMELINES_DIR
 IMGS_DIR       = IMG_OUTPUT_DIR
 OUTPUT_DIR     = RENDER_OUTPUT_DIR
 
-FPS = 30  # FPS fixo do vídeo
 FOURCCS_TRY = ["mp4v", "avc1", "X264", "H264", "MJPG"]
 
+# Output presets (RENDER_PRESET or --preset): (resolution policy, fps). FPS and
+# RENDER_RESOLUTION are set from the preset by apply_preset() below; RENDER_FPS /
+# RENDER_RESOLUTION override its values.
+# Resolution policies, planned from the image headers before rendering: "majority"
+# (most common image size), "first" (first readable image), "largest", a height
+# preset ("720p", "1080p", ... oriented like the majority) or "WxH".
+RENDER_PRESETS = {
+    "source": ("majority", 30),
+    "720p": ("720p", 30),
+    "1080p": ("1080p", 30),
+    "1080p60": ("1080p", 60),
+    "1440p": ("1440p", 30),
+    "2160p": ("2160p", 30),
+    "shorts": ("1080x1920", 30),
+}
+HEIGHT_PRESETS = {"480p": 480, "720p": 720, "1080p": 1080, "1440p": 1440, "2160p": 2160}
+# JPEGs at least 2x larger than the frame they fill are decoded at 1/2, 1/4 or
+# 1/8 size (libjpeg scales in the DCT domain: faster, less memory per scene).
+# RENDER_REDUCED_DECODE=0 always decodes at full size.
+RENDER_REDUCED_DECODE = os.getenv("RENDER_REDUCED_DECODE", "1") != "0"
+
+# "auto": hold-frame encoding through ffmpeg when it is available, otherwise OpenCV.
+# "ffmpeg" / "opencv" force one path.
+RENDER_MODE = os.getenv("RENDER_MODE", "auto").strip().lower()
+# Hold-frame path: each scene is one encoded frame shown for the scene's duration
+# (variable frame rate), so encode time follows the scene count, not the video length.
+# No B-frames: they shift the mp4 edit list by the first scenes' durations.
+STILL_CODEC_ARGS = ["-c:v", "libx264", "-preset", "veryfast", "-tune", "stillimage",
+                    "-bf", "0", "-crf", "20", "-pix_fmt", "yuv420p"]
+STILL_JPEG_QUALITY = 95
+# Parallel (base, variant) renders: `--jobs N` or RENDER_JOBS. Each worker process
+# renders one job and exits (frees its memory); RENDER_WORKER_MEM_MB caps its
+# address space where the OS supports it (0 = no cap).
+RENDER_JOBS = int(os.getenv("RENDER_JOBS", "1") or 1)
+RENDER_WORKER_MEM_MB = int(os.getenv("RENDER_WORKER_MEM_MB", "0") or 0)
+# Split one video into this many contiguous scene ranges, encode them concurrently
+# and join the segments losslessly (needs ffmpeg): `--chunks N` or RENDER_CHUNKS.
+RENDER_CHUNKS = int(os.getenv("RENDER_CHUNKS", "1") or 1)
+# RENDER_CFR=1: expand the stills to a constant FPS stream (slower, for picky players/editors).
+RENDER_CFR = os.getenv("RENDER_CFR", "0") == "1"
+# Decode + letterbox the next RENDER_PREFETCH scenes in background threads while the
+# current one is encoded; RENDER_PREFETCH_MB caps the decoded frames held ahead.
+RENDER_PREFETCH = int(os.getenv("RENDER_PREFETCH", "4") or 0)
+RENDER_PREFETCH_MB = int(os.getenv("RENDER_PREFETCH_MB", "512") or 0)
+RENDER_DECODE_THREADS = int(os.getenv("RENDER_DECODE_THREADS", "0") or 0) or min(4, os.cpu_count() or 1)
+# RENDER_MOTION=kenburns: slow zoom/pan on every still (frame-by-frame render, so
+# the hold-frame path and the segment cache are skipped). RENDER_KENBURNS_ZOOM is
+# the zoom reached at the end (or start) of each scene.
+RENDER_MOTION = os.getenv("RENDER_MOTION", "none").strip().lower()
+if RENDER_MOTION not in ("none", "kenburns"):
+    print(f"⚠️ Unknown RENDER_MOTION={RENDER_MOTION!r}; using 'none'.")
+    RENDER_MOTION = "none"
+RENDER_KENBURNS_ZOOM = float(os.getenv("RENDER_KENBURNS_ZOOM", "1.12") or 1.12)
+# RENDER_CROSSFADE=<seconds>: dissolve between consecutive scenes, centred on the
+# cut (0 = hard cuts). Only the overlap frames are blended.
+RENDER_CROSSFADE = float(os.getenv("RENDER_CROSSFADE", "0") or 0)
+# ffmpeg path: every scene is encoded once into a cached segment keyed by image
+# content, frame count, size and encoder settings; a render joins the segments, so
+# replacing one image only re-encodes that scene. A cold render through the cache is
+# slower than a direct one, so by default (auto) only bases that were already
+# rendered with RENDER_CACHE=1 keep using it; RENDER_CACHE=0 never uses it.
+# RENDER_CACHE_MB caps the cache (least recently used segments go first).
+_RENDER_CACHE_ENV = os.getenv("RENDER_CACHE", "auto").strip().lower()
+RENDER_CACHE = _RENDER_CACHE_ENV == "1"
+RENDER_CACHE_AUTO = _RENDER_CACHE_ENV not in ("0", "1")
+RENDER_CACHE_MB = int(os.getenv("RENDER_CACHE_MB", "4096") or 0)
+# RENDER_SUBTITLES=1: burn the base's SRT cues into the video. Each cue is rasterized
+# once and blended onto the caption box only, for the frames it is on screen.
+# Text height is RENDER_SUBTITLE_SIZE × frame height; RENDER_SUBTITLE_FONT = .ttf path.
+RENDER_SUBTITLES = os.getenv("RENDER_SUBTITLES", "0") == "1"
+RENDER_SUBTITLE_SIZE = float(os.getenv("RENDER_SUBTITLE_SIZE", "0.045") or 0.045)
+RENDER_SUBTITLE_FONT = os.getenv("RENDER_SUBTITLE_FONT", "").strip()
+# Attach the base's narration (manifest audio_file) to every rendered variant by
+# stream copy. RENDER_AUDIO=0 keeps the videos silent.
+RENDER_AUDIO = os.getenv("RENDER_AUDIO", "1") != "0"
+# Stretch/shrink the SRT-estimated scene times so the timeline ends with the real
+# narration (read from the mp3 headers). TIMELINE_FIT_AUDIO=0 keeps the SRT times.
+TIMELINE_FIT_AUDIO = os.getenv("TIMELINE_FIT_AUDIO", "1") != "0"
+# --preview (or RENDER_PREVIEW=1): quick review copy at PREVIEW_RESOLUTION /
+# PREVIEW_FPS with the fastest encoder settings, written to output/render_preview/.
+# It uses the same timeline as the full render (fitted on the full render's frame
+# grid) and does not touch the manifest's timeline/video stages.
+RENDER_PREVIEW = False
+PREVIEW_RESOLUTION = "480p"
+PREVIEW_FPS = 10
+PREVIEW_CODEC_ARGS = ["-c:v", "libx264", "-preset", "ultrafast", "-tune", "stillimage",
+                      "-bf", "0", "-crf", "30", "-pix_fmt", "yuv420p"]
+PREVIEW_JPEG_QUALITY = 80
+
+def apply_preset(name: str):
+    """Sets FPS and RENDER_RESOLUTION (and what derives from FPS) from a RENDER_PRESETS entry."""
+    global RENDER_PRESET, FPS, TIMELINE_FPS, RENDER_RESOLUTION, CROSSFADE_FRAMES
+    if name not in RENDER_PRESETS:
+        print(f"⚠️ Unknown render preset {name!r}; using 'source' ({', '.join(RENDER_PRESETS)}).")
+        name = "source"
+    resolution, fps = RENDER_PRESETS[name]
+    RENDER_PRESET = name
+    FPS = int(os.getenv("RENDER_FPS", "0") or 0) or fps
+    RENDER_RESOLUTION = os.getenv("RENDER_RESOLUTION", "").strip().lower() or resolution
+    if (RENDER_RESOLUTION not in ("majority", "first", "largest") and RENDER_RESOLUTION not in HEIGHT_PRESETS
+            and not re.fullmatch(r"\d+x\d+", RENDER_RESOLUTION)):
+        print(f"⚠️ Unknown RENDER_RESOLUTION={RENDER_RESOLUTION!r}; using {resolution!r}.")
+        RENDER_RESOLUTION = resolution
+    TIMELINE_FPS = FPS  # frame grid the timeline is fitted on
+    CROSSFADE_FRAMES = max(0, int(round(RENDER_CROSSFADE * FPS)))
+    os.environ["RENDER_PRESET"] = name  # spawned render workers re-read it
+
+def apply_preview():
+    """Switches to the preview size, fps, encoder and folder; TIMELINE_FPS keeps the preset's grid."""
+    global RENDER_PREVIEW, FPS, RENDER_RESOLUTION, CROSSFADE_FRAMES, STILL_CODEC_ARGS, STILL_JPEG_QUALITY, OUTPUT_DIR
+    RENDER_PREVIEW = True
+    FPS, RENDER_RESOLUTION = PREVIEW_FPS, PREVIEW_RESOLUTION
+    CROSSFADE_FRAMES = max(0, int(round(RENDER_CROSSFADE * FPS)))
+    STILL_CODEC_ARGS, STILL_JPEG_QUALITY = PREVIEW_CODEC_ARGS, PREVIEW_JPEG_QUALITY
+    OUTPUT_DIR = RENDER_PREVIEW_DIR
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    os.environ["RENDER_PREVIEW"] = "1"
+
+apply_preset(os.getenv("RENDER_PRESET", "source").strip().lower())
+if os.getenv("RENDER_PREVIEW", "0") == "1":
+    apply_preview()
+
 # make sure output directories exist
 for d in (TIMELINE_DIR, OUTPUT_DIR):
     d.mkdir(parents=True, exist_ok=True)
@@ -46,12 +184,22 @@ def list_image_variants(base: str) -> list[str]:
     return sorted(variants, key=sort_key)
 
 
-def imread_u8(path_str: str):
+REDUCED_READS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+def imread_u8(path_str: str, scale: float = 1.0):
+    """
+    Decodes an image. `scale` is the resize the caller will apply: a JPEG that
+    will shrink by 2x or more is decoded at the largest 1/2, 1/4 or 1/8
+    reduction that still leaves it at least as large as needed.
+    """
     try:
         data = np.fromfile(path_str, dtype=np.uint8)
         if data.size == 0:
             return None
-        img = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        flags = cv2.IMREAD_COLOR
+        if RENDER_REDUCED_DECODE and scale <= 0.5 and data[:2].tobytes() == b"\xff\xd8":
+            flags = next(f for r, f in REDUCED_READS if r * scale <= 1)
+        img = cv2.imdecode(data, flags)
         return img
     except Exception:
         return None
@@ -151,6 +299,43 @@ def merge_timeline_by_images(base: str, scenes: list, variant: str):
         })
     return merged
 
+def scene_bounds(scenes: list) -> list[float]:
+    """Scene boundaries (first at 0, last at the timeline end), from starts when they are usable."""
+    starts = [s.get("start") for s in scenes]
+    if all(isinstance(t, (int, float)) for t in starts) and all(a < b for a, b in zip(starts, starts[1:])):
+        bounds = [0.0] + [float(t) for t in starts[1:]]
+        return bounds + [max(bounds[-1] + 0.01, float(starts[-1]) + float(scenes[-1].get("duration", 0) or 0))]
+    bounds = [0.0]
+    for s in scenes:
+        bounds.append(bounds[-1] + float(s.get("duration", 1.0) or 1.0))
+    return bounds
+
+def fit_timeline_to_audio(scenes: list, audio_seconds: float) -> float:
+    """
+    Rescales scene start/end/duration in place so the last scene ends with the
+    narration. Boundaries are snapped to the TIMELINE_FPS grid, so the rendered
+    frame count matches the audio length. Returns the scale factor applied.
+    """
+    bounds = scene_bounds(scenes)
+    scale = audio_seconds / bounds[-1]
+    frames = [int(round(b * scale * TIMELINE_FPS)) for b in bounds]
+    for i in range(1, len(frames)):
+        frames[i] = max(frames[i], frames[i - 1] + 1)  # every scene keeps at least one frame
+    for i, s in enumerate(scenes):
+        s["start"] = round(frames[i] / TIMELINE_FPS, 3)
+        s["duration"] = round((frames[i + 1] - frames[i]) / TIMELINE_FPS, 3)
+        if isinstance(s.get("end"), (int, float)):
+            s["end"] = round(s["end"] * scale, 3)
+    return scale
+
+def unscaled_srt_end(srt_path: Path, fitted: Optional[dict], current_end: float) -> float:
+    """End of the last cue in SRT time, before any narration fit was applied."""
+    if fitted and fitted.get("srt_end"):
+        return float(fitted["srt_end"])
+    if fitted and srt_path.exists():
+        return scene_bounds(parse_srt(srt_path))[-1]
+    return current_end / float((fitted or {}).get("scale", 1.0))
+
 def try_build_timeline(base: str, variant: str) -> Optional[Path]:
     """Creates or updates timeline.json according to SRT and images."""
     srt_path = SRT_DIR / f"{base}.srt"
@@ -161,10 +346,12 @@ def try_build_timeline(base: str, variant: str) -> Optional[Path]:
         return None
 
     scenes_source = []
+    fitted = None  # narration fit already applied to the stored scenes
     if timeline_path.exists():
         try:
             data = json.loads(timeline_path.read_text(encoding="utf-8"))
             scenes_source = data.get("scenes", [])
+            fitted = data.get("audio")
         except Exception as e:
             print(f"⚠️ Failed to read existing timeline ({timeline_path}): {e}")
             scenes_source = []
@@ -174,10 +361,25 @@ def try_build_timeline(base: str, variant: str) -> Optional[Path]:
             print(f"❌ SRT missing for {base}, could not build timeline {variant}.")
             return None
         scenes_source = parse_srt(srt_path)
+        fitted = None
         print(f"📝 Building timeline for {base}{variant} (from SRT)...")
 
     merged = merge_timeline_by_images(base, scenes_source, variant)
     data = {"base": base, "variant": variant, "scenes": merged}
+    if fitted:
+        data["audio"] = fitted
+    audio = narration_file(base) if TIMELINE_FIT_AUDIO and merged else None
+    audio_seconds = mp3_duration(audio) if audio else None
+    if audio_seconds and not (fitted and fitted.get("duration") == round(audio_seconds, 3)):
+        before = scene_bounds(merged)[-1]
+        srt_end = unscaled_srt_end(srt_path, fitted, before)
+        fit = fit_timeline_to_audio(merged, audio_seconds)
+        # "scale" maps SRT times onto the timeline (captions use it): always from the raw SRT end
+        scale = audio_seconds / srt_end
+        data["audio"] = {"file": audio.name, "duration": round(audio_seconds, 3),
+                         "srt_end": round(srt_end, 3), "scale": round(scale, 6)}
+        if abs(fit - 1) > 0.001:
+            print(f"🎚️ Timeline fitted to narration: {before:.1f}s → {audio_seconds:.1f}s (×{fit:.3f})")
     timeline_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
     print(f"✅ Timeline saved/updated: {timeline_path}")
     return timeline_path
@@ -194,15 +396,60 @@ def letterbox(img: np.ndarray, target_wh: Tuple[int, int]) -> np.ndarray:
     canvas[y0:y0+nh, x0:x0+nw] = resized
     return canvas
 
-def first_valid_frame_size(scenes) -> Optional[Tuple[int, int]]:
-    for s in scenes:
-        path = s.get("file")
-        if path and Path(path).exists():
-            img = imread_u8(str(path))
-            if img is not None:
-                h, w = img.shape[:2]
-                return (w, h)
-    return None
+def _scene_list(numbers: list, limit: int = 10) -> str:
+    shown = ", ".join(str(n) for n in numbers[:limit])
+    return shown + (f", … (+{len(numbers) - limit})" if len(numbers) > limit else "")
+
+def prescan_images(scenes: list, label: str) -> list[Optional[Tuple[int, int]]]:
+    """
+    (width, height) of every scene image read from its header (no pixel decode),
+    None when it is missing or unreadable. Reports those and the images whose
+    size differs from the most common one, once, before anything is rendered.
+    """
+    sizes = [image_size(s["file"]) if s.get("file") else None for s in scenes]
+    numbers = [s.get("scene", i + 1) for i, s in enumerate(scenes)]
+    missing = [n for n, s, size in zip(numbers, scenes, sizes)
+               if size is None and not (s.get("file") and Path(s["file"]).is_file())]
+    unreadable = [n for n, s, size in zip(numbers, scenes, sizes)
+                  if size is None and s.get("file") and Path(s["file"]).is_file()]
+    counts = Counter(size for size in sizes if size)
+    if counts:
+        (w, h), count = counts.most_common(1)[0]
+        print(f"🔎 [{label}] {len(scenes)} images: {count} at {w}x{h}"
+              + (f", {len(counts) - 1} other size(s)" if len(counts) > 1 else ""))
+        odd = [f"{n} ({size[0]}x{size[1]})" for n, size in zip(numbers, sizes) if size and size != (w, h)]
+        if odd:
+            print(f"⚠️ [{label}] {len(odd)} image(s) of another size will be letterboxed: scenes {_scene_list(odd)}")
+    if missing:
+        print(f"⚠️ [{label}] {len(missing)} missing image(s), rendered black: scenes {_scene_list(missing)}")
+    if unreadable:
+        print(f"❌ [{label}] {len(unreadable)} unreadable image(s), rendered black: scenes {_scene_list(unreadable)}")
+    return sizes
+
+def plan_resolution(sizes: list[Optional[Tuple[int, int]]], policy: Optional[str] = None) -> Optional[Tuple[int, int]]:
+    """Output (width, height) for the prescanned image sizes under RENDER_RESOLUTION; None if none is readable."""
+    valid = [size for size in sizes if size]
+    if not valid:
+        return None
+    policy = policy or RENDER_RESOLUTION
+    explicit = re.fullmatch(r"(\d+)x(\d+)", policy)
+    if explicit:
+        return int(explicit.group(1)), int(explicit.group(2))
+    if policy == "first":
+        return valid[0]
+    if policy == "largest":
+        return max(valid, key=lambda size: size[0] * size[1])
+    majority = Counter(valid).most_common(1)[0][0]  # ties: the size seen first
+    if policy in HEIGHT_PRESETS:
+        short = HEIGHT_PRESETS[policy]
+        long = int(round(short * 16 / 9 / 2)) * 2
+        return (short, long) if majority[1] > majority[0] else (long, short)
+    return majority
+
+def scene_frames(scene: dict) -> int:
+    """Frames a scene occupies at FPS (at least one)."""
+    dur = float(scene.get("duration", 1.0) or 1.0)
+    return max(1, int(round(dur * FPS)))
 
 def open_writer(out_path: Path, size: Tuple[int, int]):
     for fourcc_name in FOURCCS_TRY:
@@ -219,9 +466,11 @@ def open_writer(out_path: Path, size: Tuple[int, int]):
 # ======================
 # SELEÇÃO
 # ======================
-def select_bases_with_images_done(mf: dict):
+def select_bases_with_images_done():
     """Lists bases with 'images':'done' and lets user choose which to render."""
-    ready = [b for b, info in mf.items() if info.get("images") == "done" and (info.get("timeline") != "done" or info.get("video") != "done")]
+    # a preview may be wanted again for an already rendered base
+    rendered = set() if RENDER_PREVIEW else set(bases_where(images="done", timeline="done", video="done"))
+    ready = [b for b in bases_where(images="done") if b not in rendered]
     if not ready:
         print("📭 No base with 'images: done' found.")
         return []
@@ -281,101 +530,900 @@ def choose_variants_for_base(base: str, variants: list[str]) -> list[str]:
 # ======================
 # RENDER
 # ======================
-def render_video_from_scenes(base: str, scenes: list, variant: str, output_dir: Path = OUTPUT_DIR) -> bool:
-    out_path = output_dir / f"{base}{variant}.mp4"
+def use_ffmpeg() -> bool:
+    if RENDER_MODE == "opencv":
+        return False
+    if find_ffmpeg():
+        return True
+    if RENDER_MODE == "ffmpeg":
+        print("⚠️ RENDER_MODE=ffmpeg but ffmpeg was not found; using OpenCV.")
+    return False
 
-    try:
-        if not scenes:
-            print(f"⚠️ Empty timeline for {base}{variant}")
-            return False
+def prefetch_lookahead(size: Tuple[int, int]) -> int:
+    """Scenes decoded ahead of the encoder: RENDER_PREFETCH, lowered to fit RENDER_PREFETCH_MB."""
+    if RENDER_PREFETCH <= 0:
+        return 0
+    if RENDER_PREFETCH_MB <= 0:
+        return RENDER_PREFETCH
+    frame_bytes = size[0] * size[1] * 3
+    return max(1, min(RENDER_PREFETCH, RENDER_PREFETCH_MB * 1024 * 1024 // frame_bytes))
 
-        size = first_valid_frame_size(scenes)
-        if not size:
-            print(f"⚠️ No valid image found in {base}{variant}")
-            return False
+def prefetched(fn, items, lookahead: int, workers: int = RENDER_DECODE_THREADS):
+    """
+    Yields fn(item) for each item, in order, while up to `lookahead` later items
+    are computed in a thread pool (cv2 decode/resize release the GIL).
+    lookahead 0 runs everything inline.
+    """
+    if lookahead <= 0 or workers <= 0:
+        yield from map(fn, items)
+        return
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=min(workers, lookahead), thread_name_prefix="prefetch") as pool:
+        pending = deque(pool.submit(fn, item) for item in islice(items, lookahead))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for item in islice(items, 1):
+                    pending.append(pool.submit(fn, item))
+                yield result
+        finally:
+            for fut in pending:
+                fut.cancel()
 
-        writer = open_writer(out_path, size)
-        if writer is None:
-            print("❌ Could not open VideoWriter.")
-            return False
+def fit_scale(img_path, size: Tuple[int, int], cover: bool = False) -> float:
+    """Resize factor that fits (or, with cover, fills) `size`, from the image header; 1 if unknown."""
+    dims = image_size(img_path)
+    if not dims:
+        return 1.0
+    fx, fy = size[0] / dims[0], size[1] / dims[1]
+    return max(fx, fy) if cover else min(fx, fy)
 
-        total_frames = 0
-        for s in scenes:
-            img_path = s.get("file")
-            dur = float(s.get("duration", 1.0) or 1.0)
-            frames_this = max(1, int(round(dur * FPS)))
+def scene_frame(scene: dict, size: Tuple[int, int]) -> np.ndarray:
+    """Letterboxed frame for a scene (black when the image is missing or unreadable)."""
+    img_path = scene.get("file")
+    img = imread_u8(img_path, fit_scale(img_path, size)) if img_path and Path(img_path).exists() else None
+    if img is None:
+        return np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    return letterbox(img, size)
+
+# Ken Burns pans, cycled by scene number: (start x, start y) → (end x, end y) as
+# fractions of the room left around the visible window.
+KENBURNS_PANS = (((0.2, 0.5), (0.8, 0.5)), ((0.8, 0.5), (0.2, 0.5)),
+                 ((0.5, 0.2), (0.5, 0.8)), ((0.5, 0.8), (0.5, 0.2)))
+
+def motion_source(scene: dict, size: Tuple[int, int]) -> Optional[np.ndarray]:
+    """
+    Decoded image shrunk (INTER_AREA) so that at full zoom it maps ~1:1 onto the
+    frame; per-frame warps then never downscale by much. None when missing.
+    """
+    img_path = scene.get("file")
+    scale = fit_scale(img_path, size, cover=True) * RENDER_KENBURNS_ZOOM if img_path else 1.0
+    img = imread_u8(img_path, scale) if img_path and Path(img_path).exists() else None
+    if img is None:
+        return None
+    h, w = img.shape[:2]
+    f = max(size[0] / w, size[1] / h) * RENDER_KENBURNS_ZOOM
+    if f < 1:
+        img = cv2.resize(img, (max(1, round(w * f)), max(1, round(h * f))), interpolation=cv2.INTER_AREA)
+    return img
+
+def kenburns_matrices(src_wh: Tuple[int, int], size: Tuple[int, int], frames: int, number: int) -> np.ndarray:
+    """(frames, 2, 3) affine maps source → frame: cover-fit, eased zoom in/out and pan."""
+    sw, sh = src_wh
+    ow, oh = size
+    t = np.linspace(0.0, 1.0, frames) if frames > 1 else np.zeros(1)
+    ease = t * t * (3 - 2 * t)
+    zoom = 1 + (RENDER_KENBURNS_ZOOM - 1) * (ease if number % 2 else 1 - ease)
+    scale = max(ow / sw, oh / sh) * zoom
+    (fx0, fy0), (fx1, fy1) = KENBURNS_PANS[number % len(KENBURNS_PANS)]
+    x0 = np.maximum(sw - ow / scale, 0) * (fx0 + (fx1 - fx0) * ease)
+    y0 = np.maximum(sh - oh / scale, 0) * (fy0 + (fy1 - fy0) * ease)
+    mats = np.zeros((len(t), 2, 3))
+    mats[:, 0, 0] = mats[:, 1, 1] = scale
+    mats[:, 0, 2] = -x0 * scale
+    mats[:, 1, 2] = -y0 * scale
+    return mats
+
+class SceneFrames:
+    """Frames of one scene for the frame-by-frame paths: a still, or Ken Burns poses of a source."""
 
-            if not img_path or not Path(img_path).exists():
-                frame = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    def __init__(self, src: Optional[np.ndarray], scene: dict, size: Tuple[int, int], motion: bool,
+                 black: np.ndarray):
+        self.n = scene_frames(scene)
+        self.src = black if src is None else src
+        self.size = size
+        self.cues = scene.get("captions") or []
+        self.mats = None
+        if motion and src is not None:
+            self.mats = kenburns_matrices((src.shape[1], src.shape[0]), size, self.n, int(scene.get("scene", 0)))
+            self.buf = np.empty_like(black)  # warp target, reused for every pose
+
+    def frame(self, j: int) -> np.ndarray:
+        """Frame j of the scene (clamped to the scene); valid until the next call."""
+        if self.mats is None:
+            return self.src
+        m = self.mats[min(max(j, 0), self.n - 1)]
+        return cv2.warpAffine(self.src, m, self.size, dst=self.buf, flags=cv2.INTER_LINEAR,
+                              borderMode=cv2.BORDER_REPLICATE)
+
+    def caption(self, j: int):
+        """Overlay of the cue on screen at frame j, or None."""
+        text = cue_at(self.cues, j)
+        return caption_overlay(text, self.size) if text else None
+
+def cue_at(cues: list, j: int) -> Optional[str]:
+    """Text of the (first, end, text) cue on screen at frame j of a scene, or None."""
+    for first, end, text in cues:
+        if first <= j < end:
+            return text
+    return None
+
+def cue_cuts(cues: list, start: int, end: int) -> list[int]:
+    """Frames in [start, end) where the caption changes, with start and end."""
+    inner = {f for cue in cues for f in cue[:2] if start < f < end}
+    return [start, *sorted(inner), end]
+
+NO_CONTEXT = (None, None)
+
+def scene_windows(scenes: list, size: Tuple[int, int], context=NO_CONTEXT, motion: bool = False):
+    """
+    (previous, current, next) SceneFrames for every scene, decoded through the
+    prefetch pipeline. `context` holds the scenes just outside this range (for
+    crossfades at range edges); they are only decoded when crossfades are on.
+    """
+    before, after = context if CROSSFADE_FRAMES > 0 else NO_CONTEXT
+    full = ([before] if before else []) + scenes + ([after] if after else [])
+    load = motion_source if motion else scene_frame
+    black = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    sources = prefetched(lambda s: load(s, size), full, prefetch_lookahead(size))
+    views = (SceneFrames(src, s, size, motion, black) for src, s in zip(sources, full))
+    prev = next(views) if before else None
+    cur = next(views)
+    for _ in scenes:
+        nxt = next(views, None)
+        yield prev, cur, nxt
+        prev, cur = cur, nxt
+
+def crossfade_plan(scenes: list, context=NO_CONTEXT) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    Per scene, the weights of the incoming image for its first frames (fading in
+    from the previous scene) and its last frames (fading out into the next one).
+    A crossfade is centred on the cut and takes at most half of either scene.
+    """
+    before, after = context
+    full = ([before] if before else []) + scenes + ([after] if after else [])
+    frames = [scene_frames(s) for s in full]
+    heads = [np.zeros(0)] * len(full)
+    tails = [np.zeros(0)] * len(full)
+    if CROSSFADE_FRAMES > 0:
+        for k in range(len(full) - 1):
+            t = min(CROSSFADE_FRAMES // 2, frames[k] // 2)
+            h = min(CROSSFADE_FRAMES - CROSSFADE_FRAMES // 2, frames[k + 1] // 2)
+            weights = np.arange(1, t + h + 1) / (t + h + 1)
+            tails[k], heads[k + 1] = weights[:t], weights[t:]
+    off = 1 if before else 0
+    return [(heads[k], tails[k]) for k in range(off, off + len(scenes))]
+
+def write_jpeg(path: Path, img: np.ndarray) -> bool:
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, STILL_JPEG_QUALITY])
+    if ok:
+        buf.tofile(str(path))
+    return bool(ok)
+
+def prepare_still(img_path, size: Tuple[int, int], dest: Path, black: Path) -> Path:
+    """
+    JPEG for one scene: the source itself when it is a JPEG (ffmpeg letterboxes it),
+    a converted copy in `dest` for other formats, `black` (already written) when it is missing.
+    """
+    if img_path and Path(img_path).exists() and Path(img_path).stat().st_size > 0:
+        if Path(img_path).suffix.lower() in (".jpg", ".jpeg"):
+            return Path(img_path)
+        img = imread_u8(str(img_path), fit_scale(img_path, size))
+        if img is not None and write_jpeg(dest, letterbox(img, size)):
+            return dest
+    return black
+
+def is_jpeg(img_path) -> bool:
+    return bool(img_path) and Path(img_path).suffix.lower() in (".jpg", ".jpeg") \
+        and Path(img_path).is_file() and Path(img_path).stat().st_size > 0
+
+def composed_runs(scenes: list, context) -> list[tuple[object, int]]:
+    """
+    Play-order (source, frames) runs when crossfades or captions are on. A hold
+    without a caption keeps its source JPEG (ffmpeg letterboxes it, as on the
+    plain path); crossfade frames, captioned holds and other images are raw
+    frames composed in Python, keyed (scene index, "in"/"out"/"hold", frame).
+    Holds are split only where the caption changes.
+    """
+    runs = []
+    for i, (s, (head, tail)) in enumerate(zip(scenes, crossfade_plan(scenes, context))):
+        cues, n = s.get("captions") or [], scene_frames(s)
+        runs += [((i, "in", j), 1) for j in range(len(head))]
+        cuts = cue_cuts(cues, len(head), n - len(tail))
+        for a, b in zip(cuts, cuts[1:]):
+            still = is_jpeg(s.get("file")) and cue_at(cues, a) is None
+            runs.append((Path(s["file"]) if still else (i, "hold", a), b - a))
+        runs += [((i, "out", j), 1) for j in range(len(tail))]
+    return runs
+
+def composed_frames(scenes: list, size: Tuple[int, int], context, keys: list):
+    """bgr24 bytes of the raw runs `keys` (in play order), decoded through the prefetch pipeline."""
+    plan = crossfade_plan(scenes, context)
+    buf = np.empty((size[1], size[0], 3), dtype=np.uint8)
+    pending = iter(keys)
+    key = next(pending, None)
+    for i, ((prev, cur, nxt), (head, tail)) in enumerate(zip(scene_windows(scenes, size, context), plan)):
+        while key is not None and key[0] == i:
+            _, kind, j = key
+            if kind == "in":
+                img = cv2.addWeighted(prev.src, 1 - head[j], cur.src, head[j], 0, dst=buf)
+            elif kind == "out":
+                img = cv2.addWeighted(cur.src, 1 - tail[j], nxt.src, tail[j], 0, dst=buf)
+                j += cur.n - len(tail)
+            else:
+                img = cur.src
+            overlay = cur.caption(j) if cur.cues else None
+            if overlay is None:
+                data = img.tobytes()
             else:
-                img = imread_u8(img_path)
-                frame = letterbox(img, size) if img is not None else np.zeros((size[1], size[0], 3), dtype=np.uint8)
+                with overlay.drawn(img):  # img may be the scene's shared still
+                    data = img.tobytes()
+            yield data
+            key = next(pending, None)
+        if key is None:
+            return
+
+def closing_frame(scenes: list, size: Tuple[int, int], context, key) -> bytes:
+    """bgr24 bytes of the raw run `key`, decoding only its scene and neighbours."""
+    i, kind, j = key
+    before = scenes[i - 1] if i > 0 else context[0]
+    after = scenes[i + 1] if i + 1 < len(scenes) else context[1]
+    return next(composed_frames(scenes[i:i + 1], size, (before, after), [(0, kind, j)]))
+
+def pts_expr(starts: list[int]) -> str:
+    """setpts expression (in frames) putting frame N of a stream at starts[N]."""
+    expr = f"N+{starts[0]}" if starts else "N"
+    for n in range(1, len(starts)):
+        jump = starts[n] - starts[n - 1] - 1
+        if jump:
+            expr += f"+{jump}*gte(N,{n})"
+    return expr
+
+def render_stills_ffmpeg(scenes: list, size: Tuple[int, int], out_path: Path, label: str,
+                         quiet: bool = False, context=NO_CONTEXT) -> int:
+    """
+    Hold-frame render through the concat demuxer: one still + duration per scene.
+    Crossfade frames and captioned holds are streamed as raw frames over stdin
+    and interleaved by timestamp. Scene boundaries land on the same frames as
+    the OpenCV path. Returns the frame count at FPS (0 on failure).
+    """
+    w, h = size[0] - size[0] % 2, size[1] - size[1] % 2  # yuv420p needs even dimensions
+    with tempfile.TemporaryDirectory(prefix=f".{out_path.stem}_", dir=str(out_path.parent)) as tmp:
+        tmp = Path(tmp)
+        if CROSSFADE_FRAMES > 0 or any(s.get("captions") for s in scenes):
+            items = composed_runs(scenes, context)
+        else:
+            black = tmp / "black.jpg"
+            write_jpeg(black, np.zeros((h, w, 3), dtype=np.uint8))
+            stills = prefetched(
+                lambda i: prepare_still(scenes[i].get("file"), (w, h), tmp / f"scene_{i + 1:05d}.jpg", black),
+                range(len(scenes)), prefetch_lookahead((w, h)),
+            )
+            items = [(still, scene_frames(s)) for still, s in zip(stills, scenes)]
+        total_frames = sum(n for _, n in items)
+
+        # The last run is shown once more as a closing frame one frame before the
+        # end, so the file lasts exactly total_frames / FPS.
+        last, last_frames = items[-1]
+        runs = items[:-1] + ([(last, last_frames - 1)] if last_frames > 1 else []) + [(last, 1)]
+        starts = np.cumsum([0] + [n for _, n in runs[:-1]]).tolist()
+        stills = [(src, start) for (src, _), start in zip(runs, starts) if isinstance(src, Path)]
+        raws = [(src, start) for (src, _), start in zip(runs[:-1], starts) if not isinstance(src, Path)]
+
+        letterbox = f"scale={w}:{h}:force_original_aspect_ratio=decrease,pad={w}:{h}:(ow-iw)/2:(oh-ih)/2"
+        vf = f"{letterbox},setsar=1"
+        inputs, feed = [], None
+        if stills:
+            # each still lasts until the next one (raw frames fill the gaps), the last one until the end
+            ends = [start for _, start in stills[1:]] + [total_frames]
+            entries = [(p, (end - start) / FPS) for (p, start), end in zip(stills, ends)]
+            list_path = tmp / "stills.ffconcat"
+            write_concat_list(list_path, entries, framerate=FPS)
+            # shifted by the demuxer: setpts would drop the frame durations the muxer needs for the last frame
+            offset = ["-itsoffset", f"{stills[0][1] / FPS:.6f}"] if stills[0][1] else []
+            # next to raw frames the graph must not be rebuilt when the image size changes
+            # (that would flush interleave): scale and pad follow each frame instead
+            keep_graph = ["-reinit_filter", "0"] if raws else []
+            inputs += [*offset, "-f", "concat", "-safe", "0", *keep_graph, "-i", str(list_path)]
+        if raws:
+            raw_input = ["-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{w}x{h}", "-framerate", str(FPS)]
+            # one more raw frame past the end: interleave drops the last frame of each input
+            keys = [key for key, _ in raws] + [raws[-1][0]]
+            expr = pts_expr([start for _, start in raws] + [total_frames])
+            branches = [f"[{1 if stills else 0}:v]setpts='({expr})/({FPS}*TB)',setsar=1"]
+            inputs += [*raw_input, "-i", "-"]
+            if stills:
+                branches.insert(0, f"[0:v]{letterbox}:eval=frame,setsar=1")
+            closing = runs[-1][0]
+            if not isinstance(closing, Path):
+                # a composed closing frame comes from its own input, placed by the demuxer,
+                # so it keeps its duration and the file its last frame (twice, for interleave)
+                closing_path = tmp / "closing.bgr"
+                closing_path.write_bytes(closing_frame(scenes, (w, h), context, closing) * 2)
+                branches.append(f"[{2 if stills else 1}:v]setsar=1")
+                inputs += ["-itsoffset", f"{(total_frames - 1) / FPS:.6f}", *raw_input, "-i", str(closing_path)]
+            # every branch in the microsecond time base interleave outputs, so durations survive it
+            labels = [f"b{k}" for k in range(len(branches))]
+            graph = ";".join(f"{b},format=yuv420p,settb=AVTB[{l}]" for b, l in zip(branches, labels))
+            # trim drops the extra raw frame past the end
+            end = f"trim=end={total_frames * 1_000_000 // FPS / 1e6:.6f}"
+            if RENDER_CFR:
+                # holds filled from the timestamps: raw frames carry no duration for ffmpeg's frame sync
+                end += f",fps={FPS}"
+            graph += ";" + "".join(f"[{l}]" for l in labels) + f"interleave=nb_inputs={len(labels)},{end}[v]"
+            filters = ["-filter_complex", graph, "-map", "[v]"]
+            feed = composed_frames(scenes, (w, h), context, keys)
+        else:
+            filters = ["-vf", vf]
+        if RENDER_CFR:
+            timing = ["-fps_mode", "cfr", "-r", str(FPS), "-frames:v", str(total_frames)]
+        else:
+            # encoder time base 1/FPS as well, or the muxer re-rounds to its 1/25 default
+            timing = ["-fps_mode", "vfr", "-enc_time_base", f"1/{FPS}", *([] if raws else ["-frames:v", str(len(runs))])]
+        args = [
+            *inputs, *filters,
+            *timing, *STILL_CODEC_ARGS,
+            # a timescale that is a multiple of FPS keeps every duration exact
+            "-video_track_timescale", str(FPS * 1000),
+            "-movflags", "+faststart",
+            str(out_path),
+        ]
+        if not quiet:
+            mode = "cfr" if RENDER_CFR else "vfr"
+            extra = f", {len(raws)} composed frame(s)" if raws else ""
+            print(f"🎞️  ffmpeg hold-frame ({mode}): {len(scenes)} scenes{extra}, {w}x{h} @ {FPS}fps → {out_path}")
+        if not run_ffmpeg(args, label=label, feed=feed):
+            return 0
+    return total_frames
 
-            for _ in range(frames_this):
-                writer.write(frame)
-            total_frames += frames_this
+def render_frames_opencv(scenes: list, size: Tuple[int, int], out_path: Path, context=NO_CONTEXT) -> int:
+    """Frame-by-frame render with cv2.VideoWriter. Returns the frames written (0 on failure)."""
+    writer = open_writer(out_path, size)
+    if writer is None:
+        print("❌ Could not open VideoWriter.")
+        return 0
 
+    windows = scene_windows(scenes, size, context, motion=RENDER_MOTION == "kenburns")
+    blend = np.empty((size[1], size[0], 3), dtype=np.uint8)  # crossfade target, reused
+    total_frames = 0
+    try:
+        for (prev, cur, nxt), (head, tail) in zip(windows, crossfade_plan(scenes, context)):
+            fade_out = cur.n - len(tail)
+            for j in range(cur.n):
+                if j < len(head):
+                    frame = cv2.addWeighted(prev.frame(prev.n - 1), 1 - head[j], cur.frame(j), head[j], 0, dst=blend)
+                elif j >= fade_out:
+                    wgt = tail[j - fade_out]
+                    frame = cv2.addWeighted(cur.frame(j), 1 - wgt, nxt.frame(0), wgt, 0, dst=blend)
+                else:
+                    frame = cur.frame(j)
+                overlay = cur.caption(j) if cur.cues else None
+                if overlay is None:
+                    writer.write(frame)
+                else:
+                    with overlay.drawn(frame):  # frame may be the scene's shared still
+                        writer.write(frame)
+            total_frames += cur.n
+    finally:
         writer.release()
-        print(f"✅ Video finished ({total_frames} frames): {out_path}")
-        return True
+    return total_frames
+
+def render_range(scenes: list, size: Tuple[int, int], out_path: Path, label: str, context=NO_CONTEXT) -> int:
+    """
+    Renders scenes to out_path with the configured encoder (ffmpeg hold-frame or
+    OpenCV). `context` = (scene before, scene after) the range, for crossfades.
+    """
+    if RENDER_MOTION == "none" and use_ffmpeg():
+        total_frames = render_stills_ffmpeg(scenes, size, out_path, label=label, context=context)
+        if total_frames:
+            return total_frames
+        print(f"↩️ [{label}] Falling back to OpenCV render.")
+    return render_frames_opencv(scenes, size, out_path, context)
+
+def split_scenes(scenes: list, parts: int) -> list[list]:
+    """Contiguous scene ranges with roughly equal frame counts."""
+    frames = [scene_frames(s) for s in scenes]
+    target = sum(frames) / parts
+    ranges, start, acc = [], 0, 0
+    for i, f in enumerate(frames):
+        acc += f
+        if len(ranges) < parts - 1 and acc >= target * (len(ranges) + 1) and i + 1 < len(scenes):
+            ranges.append(scenes[start:i + 1])
+            start = i + 1
+    ranges.append(scenes[start:])
+    return ranges
+
+def render_chunked(scenes: list, size: Tuple[int, int], out_path: Path, label: str, chunks: int) -> int:
+    """
+    Renders contiguous scene ranges concurrently into segment files (same encoder,
+    size and FPS) and joins them with a stream copy. Every segment lasts exactly
+    its frame count / FPS, so the joined file keeps the timeline's frame grid.
+    """
+    ranges = split_scenes(scenes, chunks)
+    contexts, start = [], 0
+    for r in ranges:
+        end = start + len(r)
+        contexts.append((scenes[start - 1] if start else None, scenes[end] if end < len(scenes) else None))
+        start = end
+    stills = RENDER_MOTION == "none" and use_ffmpeg()
+
+    def render_part(i: int) -> int:
+        # one encoder for every segment, no per-segment fallback: the join is a stream copy
+        if stills:
+            return render_stills_ffmpeg(ranges[i], size, parts[i], f"{label} {i + 1}/{len(ranges)}", context=contexts[i])
+        return render_frames_opencv(ranges[i], size, parts[i], contexts[i])
+
+    print(f"🧩 [{label}] Rendering {len(ranges)} segments in parallel...")
+    with tempfile.TemporaryDirectory(prefix=f".{out_path.stem}_parts_", dir=str(out_path.parent)) as tmp:
+        parts = [Path(tmp) / f"part_{i:03d}.mp4" for i in range(len(ranges))]
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            counts = list(pool.map(render_part, range(len(ranges))))
+        failed = [i + 1 for i, n in enumerate(counts) if not n]
+        if failed:
+            print(f"❌ [{label}] Segment(s) {failed} failed")
+            return 0
+        expected = [sum(scene_frames(s) for s in r) for r in ranges]
+        if counts != expected:
+            print(f"❌ [{label}] Segment frame counts {counts} != timeline {expected}")
+            return 0
+
+        joined = join_segments(parts, out_path, label, Path(tmp))
+    return sum(counts) if joined else 0
+
+def join_segments(parts: list[Path], out_path: Path, label: str, tmp: Path) -> bool:
+    """Concatenates segments encoded with identical settings by stream copy."""
+    list_path = tmp / "parts.ffconcat"
+    write_concat_list(list_path, [(p, None) for p in parts])
+    return run_ffmpeg(
+        ["-f", "concat", "-safe", "0", "-i", str(list_path), "-c", "copy",
+         "-movflags", "+faststart", str(out_path)],
+        label=f"{label} join",
+    )
+
+def render_cached(scenes: list, size: Tuple[int, int], out_path: Path, label: str) -> int:
+    """
+    Joins one cached segment per scene, encoding (in parallel) only the scenes
+    whose key is not in the cache yet. Returns the frame count (0 on failure).
+    """
+    w, h = size[0] - size[0] % 2, size[1] - size[1] % 2
+    cache = SegmentCache(RENDER_CACHE_DIR, RENDER_CACHE_MB)
+    digests, keys, scene_of = {}, [], {}
+
+    def digest(scene: Optional[dict]) -> Optional[str]:
+        if scene is None:
+            return None
+        img = scene.get("file")
+        if img not in digests:
+            digests[img] = file_digest(img) if img else "missing"
+        return digests[img]
+
+    for i, s in enumerate(scenes):
+        parts = dict(image=digest(s), frames=scene_frames(s), size=[w, h], fps=FPS,
+                     cfr=RENDER_CFR, codec=STILL_CODEC_ARGS, jpeg=STILL_JPEG_QUALITY)
+        context = NO_CONTEXT
+        if CROSSFADE_FRAMES > 0:
+            # the fades into and out of a scene depend on its neighbours
+            context = (scenes[i - 1] if i else None, scenes[i + 1] if i + 1 < len(scenes) else None)
+            parts["crossfade"] = [CROSSFADE_FRAMES] + [[digest(c), scene_frames(c)] if c else None for c in context]
+        if s.get("captions"):
+            parts["captions"] = [s["captions"], RENDER_SUBTITLE_SIZE, RENDER_SUBTITLE_FONT]
+        key = cache.key(**parts)
+        keys.append(key)
+        scene_of.setdefault(key, (s, context))
+
+    segments = {key: cache.get(key) for key in scene_of}
+    missing = [key for key, path in segments.items() if path is None]
+    print(f"🗃️  [{label}] Segment cache: {len(scenes) - sum(keys.count(k) for k in missing)}/{len(scenes)} "
+          f"scenes cached, {len(missing)} segment(s) to encode")
+
+    def encode(key: str) -> Optional[Path]:
+        tmp = cache.temp_path(key)
+        try:
+            scene, context = scene_of[key]
+            frames = render_stills_ffmpeg([scene], (w, h), tmp, label, quiet=True, context=context)
+            return cache.put(key, tmp) if frames == scene_frames(scene) else None
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=RENDER_DECODE_THREADS) as pool:
+            segments.update(zip(missing, pool.map(encode, missing)))
+    if any(segments[key] is None for key in missing):
+        print(f"❌ [{label}] Some scene segments could not be encoded.")
+        return 0
+
+    print(f"🎞️  Joining {len(keys)} segments, {w}x{h} @ {FPS}fps → {out_path}")
+    with tempfile.TemporaryDirectory(prefix=f".{out_path.stem}_", dir=str(out_path.parent)) as tmp:
+        joined = join_segments([segments[key] for key in keys], out_path, label, Path(tmp))
+    if joined:
+        cache.record(label, keys)
+    removed = cache.prune()
+    if removed:
+        print(f"🧹 Segment cache over {RENDER_CACHE_MB} MB: removed {removed} old segment(s).")
+    return sum(scene_frames(s) for s in scenes) if joined else 0
+
+def use_segment_cache(label: str) -> bool:
+    """RENDER_CACHE=1, or (auto) a previous cached render of this base + variant."""
+    if RENDER_MOTION != "none" or not (RENDER_CACHE or RENDER_CACHE_AUTO) or not use_ffmpeg():
+        return False
+    return RENDER_CACHE or SegmentCache(RENDER_CACHE_DIR).has_record(label)
+
+def render_video_from_scenes(base: str, scenes: list, variant: str, output_dir: Optional[Path] = None,
+                             chunks: int = RENDER_CHUNKS) -> int:
+    """Renders the scenes to <base><variant>.mp4. Returns the frames written (0 on failure)."""
+    out_path = (output_dir or OUTPUT_DIR) / f"{base}{variant}.mp4"
+    label = f"{base}{variant}"
+
+    try:
+        if not scenes:
+            print(f"⚠️ Empty timeline for {base}{variant}")
+            return 0
+
+        sizes = prescan_images(scenes, label)
+        size = plan_resolution(sizes)
+        if not size:
+            print(f"⚠️ No valid image found in {base}{variant}")
+            return 0
+        # unreadable images render black on every path (ffmpeg would reject the whole list)
+        scenes = [{**s, "file": None} if sz is None and s.get("file") else s for s, sz in zip(scenes, sizes)]
+
+        total_frames = 0
+        chunks = min(chunks, len(scenes))
+        if use_segment_cache(label):
+            if chunks > 1:
+                print(f"⚠️ [{label}] --chunks {chunks} ignored: the segment cache already encodes scenes "
+                      "in parallel (RENDER_CACHE=0 renders in chunks).")
+            total_frames = render_cached(scenes, size, out_path, label)
+            if not total_frames:
+                print(f"↩️ [{label}] Cached render failed; rendering without the segment cache.")
+        elif chunks > 1 and find_ffmpeg():
+            total_frames = render_chunked(scenes, size, out_path, label, chunks)
+            if not total_frames:
+                print(f"↩️ [{label}] Chunked render failed; rendering in one piece.")
+        if not total_frames:
+            total_frames = render_range(scenes, size, out_path, label)
+        if total_frames:
+            print(f"✅ Video finished ({total_frames} frames): {out_path}")
+        return total_frames
 
     except Exception as e:
         print(f"❌ Error generating video for {base}{variant}: {e}")
-        return False
+        return 0
 
-def render_video(base: str, timeline_path: Path, variant: str) -> bool:
+def render_video(base: str, timeline_path: Path, variant: str, chunks: int = RENDER_CHUNKS) -> int:
     try:
         data = json.loads(timeline_path.read_text(encoding="utf-8"))
         scenes = data.get("scenes", [])
-        return render_video_from_scenes(base, scenes, variant)
+        if RENDER_SUBTITLES and scenes:
+            srt_path = SRT_DIR / f"{base}.srt"
+            if srt_path.exists():
+                scale = float((data.get("audio") or {}).get("scale", 1.0))
+                scenes = with_captions(scenes, read_cues(srt_path), scale)
+            else:
+                print(f"⚠️ RENDER_SUBTITLES=1 but {srt_path.name} is missing; rendering without captions.")
+        return render_video_from_scenes(base, scenes, variant, chunks=chunks)
     except Exception as e:
         print(f"❌ Error reading timeline for {base}{variant}: {e}")
-        return False
+        return 0
+
+# ======================
+# CAPTIONS
+# ======================
+def caption_overlay(text: str, size: Tuple[int, int]):
+    """Cached overlay of one cue for frames of `size` with the configured style."""
+    px = max(8, int(round(size[1] * RENDER_SUBTITLE_SIZE)))
+    return cue_overlay(text, size, px, RENDER_SUBTITLE_FONT)
+
+def with_captions(scenes: list, cues: list[tuple[float, float, str]], scale: float = 1.0) -> list:
+    """
+    Copies of the scenes with a "captions" list of (first frame, end frame, text)
+    relative to each scene. Cue times are scaled like the timeline (narration
+    fit) and snapped to the frame grid; a cue spanning a cut is split.
+    """
+    spans = [(int(round(a * scale * FPS)), int(round(b * scale * FPS)), text) for a, b, text in cues]
+    spans.sort()
+    out, start, k = [], 0, 0
+    for s in scenes:
+        end = start + scene_frames(s)
+        while k < len(spans) and spans[k][1] <= start:
+            k += 1  # cues are sorted by start, so ended ones can be skipped for good
+        local = []
+        for a, b, text in islice(spans, k, None):
+            if a >= end:
+                break
+            if b > start:
+                local.append((max(a, start) - start, min(b, end) - start, text))
+        out.append({**s, "captions": local} if local else s)
+        start = end
+    print(f"💬 Captions: {len(cues)} cue(s) burned in.")
+    return out
+
+# ======================
+# AUDIO
+# ======================
+def narration_file(base: str) -> Optional[Path]:
+    """Downloaded narration of a base: the manifest's audio_file, else output/audio/<base>.mp3."""
+    entry = get_entry(base)
+    candidates = [entry.get("audio_file")] if entry and entry.get("audio_file") else []
+    candidates.append(AUDIO_OUTPUT_DIR / f"{base}.mp3")
+    for path in candidates:
+        if Path(path).is_file() and Path(path).stat().st_size > 0:
+            return Path(path)
+    return None
+
+def attach_narration(video: Path, audio: Path, label: str) -> bool:
+    """Replaces `video` with a copy that carries the narration track (no re-encode)."""
+    muxed = video.with_name(f".{video.stem}.muxing{video.suffix}")
+    try:
+        if not mux_audio(video, audio, muxed, label=f"{label} audio"):
+            return False
+        os.replace(muxed, video)
+        print(f"🔊 Narration attached: {audio.name} → {video.name}")
+        return True
+    finally:
+        muxed.unlink(missing_ok=True)
+
+# ======================
+# PARALLEL JOBS
+# ======================
+class _PrefixedStream:
+    """stdout wrapper that writes whole lines prefixed with the job name."""
+
+    def __init__(self, stream, prefix: str):
+        self.stream = stream
+        self.prefix = prefix
+        self._buf = ""
+
+    def write(self, text: str) -> int:
+        self._buf += text
+        *lines, self._buf = self._buf.split("\n")
+        if lines:
+            self.stream.write("".join(f"{self.prefix}{line}\n" if line else "\n" for line in lines))
+            self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        if self._buf:
+            self.stream.write(f"{self.prefix}{self._buf}\n")
+            self._buf = ""
+        self.stream.flush()
+
+
+@contextmanager
+def job_log_prefix(prefix: str):
+    original = sys.stdout
+    sys.stdout = _PrefixedStream(original, prefix)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stdout = original
+
+
+def build_timelines(base: str, variants: list[str]) -> dict[str, Optional[Path]]:
+    """
+    Timeline of every variant of `base`, built in the main process right before
+    its first render starts. The timeline stage is marked in_progress, then
+    done/error with the scene count, and the video stage in_progress.
+    """
+    if not RENDER_PREVIEW:
+        update_stage(base, "timeline", "in_progress")
+    paths, scenes = {}, 0
+    for variant in variants:
+        print(f"\n🎞️ Processing {base}{variant}...")
+        paths[variant] = try_build_timeline(base, variant)
+        if paths[variant]:
+            scenes += len(json.loads(paths[variant].read_text(encoding="utf-8")).get("scenes", []))
+    if not RENDER_PREVIEW:
+        ok = all(paths.values())
+        update_stage(base, "timeline", "done" if ok else "error", {"scenes": scenes})
+        update_stage(base, "video", "in_progress")
+    return paths
+
+
+def render_job(base: str, variant: str, timeline_path: Path,
+               chunks: int = RENDER_CHUNKS) -> tuple[int, Optional[dict]]:
+    """
+    Render (+ narration) of one variant from its timeline. Returns (frames
+    written, {"file", "duration", "audio"} of the output or None).
+    """
+    frames = render_video(base, timeline_path, variant, chunks=chunks)
+    if not frames:
+        return 0, None
+
+    out_path = OUTPUT_DIR / f"{base}{variant}.mp4"
+    has_audio = False
+    if RENDER_AUDIO:
+        audio = narration_file(base)
+        if audio is None:
+            print(f"🔇 No narration found for {base}; video stays silent.")
+        elif not find_ffmpeg():
+            print("🔇 ffmpeg not found; narration not attached.")
+        else:
+            has_audio = attach_narration(out_path, audio, f"{base}{variant}")
+    duration = mp4_duration(out_path) or frames / FPS
+    return frames, {"file": str(out_path), "duration": round(duration, 3), "audio": has_audio}
+
+
+def _init_render_worker(pids):
+    pids.put(os.getpid())  # lets _stop_pool find the workers without pool internals
+    cv2.setNumThreads(1)  # one core per job; the pool provides the parallelism
+    if RENDER_WORKER_MEM_MB > 0:
+        try:
+            import resource
+            limit = RENDER_WORKER_MEM_MB * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass
+
+
+def _render_job_in_worker(base: str, variant: str, timeline_path: Path,
+                          chunks: int) -> tuple[int, Optional[dict]]:
+    with job_log_prefix(f"[{base}{variant}] "):
+        try:
+            return render_job(base, variant, timeline_path, chunks)
+        except MemoryError:
+            print(f"❌ Out of memory (RENDER_WORKER_MEM_MB={RENDER_WORKER_MEM_MB}).")
+            return 0, None
+
+
+def _stop_pool(pool: ProcessPoolExecutor, running, pids):
+    """Stops the pool without waiting for it (SIGTERM / Ctrl+C), so the manifest flush runs right away."""
+    for fut in running:
+        fut.cancel()
+    workers = set()
+    while True:
+        try:
+            workers.add(pids.get_nowait())
+        except queue.Empty:
+            break
+    # jobs already rendering would otherwise keep their worker (and ffmpeg) alive;
+    # only live children are signalled, so a recycled PID is never hit
+    for proc in multiprocessing.active_children():
+        if proc.pid in workers:
+            proc.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_render_jobs(plan: list[tuple[str, list[str]]], jobs: int, chunks: int = RENDER_CHUNKS):
+    """
+    Renders every (base, variant) of the plan, `jobs` at a time. A base's
+    timelines are built when its first job starts; its video stage is written
+    once, after all of its variants finished.
+    """
+    results = {base: {"video_ok": True, "frames": 0, "scenes": 0, "videos": {}, "left": len(variants)}
+               for base, variants in plan}
+
+    def finish(base: str, frames: int, video: Optional[dict] = None):
+        r = results[base]
+        r["video_ok"] &= frames > 0
+        r["frames"] += frames
+        if video:
+            r["videos"][Path(video["file"]).name] = {"duration": video["duration"], "audio": video["audio"]}
+        r["left"] -= 1
+        if r["left"] == 0 and RENDER_PREVIEW:
+            names = ", ".join(sorted(r["videos"])) or "none"
+            print(f"👀 Preview of {base} ready in {OUTPUT_DIR}: {names} (manifest unchanged)")
+        elif r["left"] == 0:
+            extra = {"frames": r["frames"]}
+            if r["videos"]:
+                # video_file/video_duration describe the first variant; videos lists all of them
+                name = min(r["videos"])
+                extra.update(video_file=str(OUTPUT_DIR / name), video_duration=r["videos"][name]["duration"],
+                             videos=r["videos"])
+            update_stage(base, "video", "done" if r["video_ok"] else "error", extra)
+
+    def jobs_to_start():
+        """(base, variant, timeline) in plan order; variants without a timeline finish right away."""
+        for base, variants in plan:
+            timelines = build_timelines(base, variants)
+            for variant in variants:
+                if timelines[variant]:
+                    yield base, variant, timelines[variant]
+                else:
+                    finish(base, 0)
+
+    if jobs <= 1:
+        for base, variant, timeline_path in jobs_to_start():
+            finish(base, *render_job(base, variant, timeline_path, chunks))
+        return
+
+    # spawn: workers must not inherit the session timer thread or held locks
+    ctx = multiprocessing.get_context("spawn")
+    pids = ctx.Queue()
+    pool_kwargs = {"max_workers": jobs, "initializer": _init_render_worker, "initargs": (pids,),
+                   "mp_context": ctx}
+    if sys.version_info >= (3, 11):
+        pool_kwargs["max_tasks_per_child"] = 1
+    print(f"🧵 Rendering {sum(len(v) for _, v in plan)} job(s) with {jobs} workers...")
+    pool = ProcessPoolExecutor(**pool_kwargs)
+    running = {}
+    pending = jobs_to_start()
+    try:
+        # Submit only as workers free up, so a base is started (and flagged) when it really starts.
+        while True:
+            for base, variant, timeline_path in pending:
+                running[pool.submit(_render_job_in_worker, base, variant, timeline_path, chunks)] = (base, variant)
+                if len(running) >= jobs:
+                    break
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                base, variant = running.pop(fut)
+                try:
+                    frames, video = fut.result()
+                except Exception as e:  # worker crashed (e.g. killed by the OS)
+                    print(f"❌ [{base}{variant}] Render job failed: {e}")
+                    frames, video = 0, None
+                finish(base, frames, video)
+    except BaseException:
+        _stop_pool(pool, running, pids)
+        raise
+    pool.shutdown()
+
 
 # ======================
 # MAIN
 # ======================
-def main():
+def main(jobs: int = RENDER_JOBS, chunks: int = RENDER_CHUNKS):
     try:
-        mf = load_manifest()
-        selected_bases = select_bases_with_images_done(mf)
+        selected_bases = select_bases_with_images_done()
 
         if not selected_bases:
             return
 
+        # Pick variants for every base first; each base is flagged in_progress when its jobs start.
+        plan: list[tuple[str, list[str]]] = []
+        errors = []
         for base in selected_bases:
             variants = list_image_variants(base)
             if not variants:
                 print(f"⚠️ No image variants found in {IMGS_DIR / base}.")
-                update_stage(base, "timeline", "error")
-                update_stage(base, "video", "error")
+                errors += [(base, "timeline", "error"), (base, "video", "error")]
                 continue
 
             chosen_variants = choose_variants_for_base(base, variants)
             if not chosen_variants:
                 continue
 
-            update_stage(base, "timeline", "in_progress")
-            update_stage(base, "video", "in_progress")
-
-            timeline_ok = True
-            video_ok = True
-
-            for variant in chosen_variants:
-                print(f"\n🎞️ Processing {base}{variant}...")
-                timeline_path = try_build_timeline(base, variant)
-                if not timeline_path:
-                    timeline_ok = False
-                    video_ok = False
-                    continue
-                success = render_video(base, timeline_path, variant)
-                if not success:
-                    video_ok = False
-
-            update_stage(base, "timeline", "done" if timeline_ok else "error")
-            update_stage(base, "video", "done" if video_ok else "error")
+            plan.append((base, chosen_variants))
+
+        with manifest_session():
+            if errors and not RENDER_PREVIEW:
+                update_stages(errors)
+            run_render_jobs(plan, jobs, chunks)
+
+        auto_archive()
     finally:
         ring_bell("✅ Render finished.")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build timelines and render videos.")
+    parser.add_argument("--jobs", type=int, default=RENDER_JOBS,
+                        help="Render this many (base, variant) jobs in parallel.")
+    parser.add_argument("--chunks", type=int, default=RENDER_CHUNKS,
+                        help="Split each video into this many segments rendered in parallel.")
+    parser.add_argument("--preset", choices=sorted(RENDER_PRESETS), default=None,
+                        help="Output resolution/fps preset (default: RENDER_PRESET or 'source').")
+    parser.add_argument("--preview", action="store_true",
+                        help=f"Quick {PREVIEW_RESOLUTION}/{PREVIEW_FPS}fps review copy in {RENDER_PREVIEW_DIR.name}/ "
+                             "(same timeline, manifest untouched).")
+    cli = parser.parse_args()
+    if cli.preset:
+        apply_preset(cli.preset)
+    if cli.preview:
+        apply_preview()
+    main(jobs=max(1, cli.jobs), chunks=max(1, cli.chunks))
@@ -0,0 +1,275 @@
+# render_benchmark.py — synthetic render benchmarks for make_and_render (offline, no manifest)
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from support_scripts.paths import OUTPUT_ROOT, ROOT
+
+# ======================
+# CONFIG
+# ======================
+BENCH_DIR = OUTPUT_ROOT / "benchmarks"
+
+# Synthetic cases: scene count, (min, max) scene seconds, source sizes (cycled
+# scene by scene), the share of scenes whose image file does not exist and,
+# optionally, the RENDER_RESOLUTION policy (default: the renderer's).
+CASES = {
+    "small":      {"scenes": 20,  "durations": (2.0, 5.0),   "sizes": [(1920, 1080)], "missing": 0.0},
+    "many_short": {"scenes": 200, "durations": (0.5, 1.5),   "sizes": [(1280, 720)],  "missing": 0.0},
+    "long_holds": {"scenes": 10,  "durations": (20.0, 40.0), "sizes": [(1920, 1080)], "missing": 0.0},
+    "oversized":  {"scenes": 20,  "durations": (2.0, 5.0),   "sizes": [(4096, 2304)], "missing": 0.0,
+                   "resolution": "1080p"},
+    "mixed":      {"scenes": 40,  "durations": (1.0, 6.0),
+                   "sizes": [(1920, 1080), (1920, 1080), (1024, 1536)], "missing": 0.1},
+}
+# Render modes: make_and_render globals set before the render. "warm" renders
+# once before the timed run (segment cache already filled).
+MODES = {
+    "ffmpeg":    {"RENDER_MODE": "ffmpeg", "RENDER_CACHE": False},
+    "cached":    {"RENDER_MODE": "ffmpeg", "RENDER_CACHE": True},
+    "warm":      {"RENDER_MODE": "ffmpeg", "RENDER_CACHE": True},
+    "opencv":    {"RENDER_MODE": "opencv", "RENDER_CACHE": False},
+    "crossfade": {"RENDER_MODE": "ffmpeg", "RENDER_CACHE": False, "CROSSFADE_FRAMES": 15},
+    "kenburns":  {"RENDER_MODE": "opencv", "RENDER_CACHE": False, "RENDER_MOTION": "kenburns"},
+}
+DEFAULT_CASES = ["small", "many_short", "long_holds", "oversized", "mixed"]
+DEFAULT_MODES = ["ffmpeg", "cached", "warm", "opencv"]
+FFMPEG_MODES = {"ffmpeg", "cached", "warm", "crossfade"}
+
+# ======================
+# SYNTHETIC DATA
+# ======================
+def synthetic_image(path: Path, size: tuple[int, int], number: int, rng: np.random.Generator):
+    """JPEG of smooth random colour fields, a ramp, grain and a label: compresses like a picture, not a flat fill."""
+    w, h = size
+    small = rng.integers(0, 256, (max(2, h // 32), max(2, w // 32), 3), dtype=np.uint8)
+    img = cv2.resize(small, (w, h), interpolation=cv2.INTER_CUBIC)
+    ramp = np.linspace(0, 96, w, dtype=np.float32)[None, :, None]
+    img = cv2.add(img, ramp.astype(np.uint8).repeat(h, axis=0).repeat(3, axis=2))
+    noise = rng.integers(0, 24, (h, w, 3), dtype=np.uint8)
+    img = cv2.add(img, noise)
+    cv2.putText(img, f"scene {number}", (w // 20, h // 5), cv2.FONT_HERSHEY_DUPLEX, h / 300,
+                (255, 255, 255), max(1, h // 200), cv2.LINE_AA)
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 92])
+    if ok:
+        buf.tofile(str(path))
+
+
+def build_case(name: str, spec: dict, workdir: Path, seed: int, scale: float = 1.0) -> Path:
+    """Writes the images and the timeline of a case (reused when they already exist). Returns the timeline."""
+    count = max(2, int(round(spec["scenes"] * scale)))
+    case_dir = workdir / f"{name}_{count}_s{seed}"
+    timeline = case_dir / "timeline.json"
+    if timeline.exists():
+        return timeline
+    case_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    lo, hi = spec["durations"]
+    missing = set(rng.choice(count, size=int(round(count * spec["missing"])), replace=False).tolist())
+    scenes, start = [], 0.0
+    for i in range(count):
+        duration = round(float(rng.uniform(lo, hi)), 3)
+        path = case_dir / f"{i + 1:05d}.jpg"
+        if i in missing:
+            path = case_dir / f"missing_{i + 1:05d}.jpg"
+        else:
+            synthetic_image(path, tuple(spec["sizes"][i % len(spec["sizes"])]), i + 1, rng)
+        scenes.append({"scene": i + 1, "start": round(start, 3), "end": round(start + duration, 3),
+                       "duration": duration, "file": str(path)})
+        start += duration
+    timeline.write_text(json.dumps({"base": name, "variant": "", "scenes": scenes}, indent=2), encoding="utf-8")
+    return timeline
+
+# ======================
+# MEASURE
+# ======================
+def peak_rss_mb() -> tuple[float | None, float | None]:
+    """Peak RSS of this process and of its largest finished child (ffmpeg), in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None, None
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024  # bytes on macOS, KB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 2**20
+    child = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit / 2**20
+    return round(own, 1), round(child, 1)
+
+
+def run_worker(job: dict) -> dict:
+    """One timed render in this (fresh) process; the render's own log is discarded."""
+    import make_and_render as m
+
+    for key, value in MODES[job["mode"]].items():
+        setattr(m, key, value)
+    m.RENDER_CACHE_DIR = Path(job["cache_dir"])
+    if job.get("resolution"):
+        m.RENDER_RESOLUTION = job["resolution"]
+    data = json.loads(Path(job["timeline"]).read_text(encoding="utf-8"))
+    scenes, out_dir = data["scenes"], Path(job["out_dir"])
+    variant = f"_{job['case']}_{job['mode']}"
+    with open(os.devnull, "w", encoding="utf-8") as devnull, redirect_stdout(devnull):
+        if job["mode"] == "warm":
+            m.render_video_from_scenes("bench", scenes, variant, output_dir=out_dir, chunks=job["chunks"])
+        t0 = time.perf_counter()
+        frames = m.render_video_from_scenes("bench", scenes, variant, output_dir=out_dir, chunks=job["chunks"])
+        wall = time.perf_counter() - t0
+    out_path = out_dir / f"bench{variant}.mp4"
+    size_mb = out_path.stat().st_size / 2**20 if frames and out_path.exists() else 0.0
+    rss, child_rss = peak_rss_mb()
+    return {
+        "case": job["case"], "mode": job["mode"], "scenes": len(scenes), "frames": frames,
+        "video_seconds": round(frames / m.FPS, 3), "wall_seconds": round(wall, 3),
+        "fps": round(frames / wall, 1) if wall else None,
+        "realtime": round(frames / m.FPS / wall, 2) if wall else None,
+        "output_mb": round(size_mb, 3), "output_mb_s": round(size_mb / wall, 3) if wall else None,
+        "peak_rss_mb": rss, "peak_child_rss_mb": child_rss, "ok": frames > 0,
+    }
+
+
+def run_job(job: dict) -> dict:
+    """Runs run_worker in a new interpreter, so peak RSS belongs to this configuration only."""
+    with tempfile.NamedTemporaryFile("r", suffix=".json", delete=False) as f:
+        result_path = Path(f.name)
+    try:
+        proc = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--worker", json.dumps(job), "--out", str(result_path)],
+            cwd=str(Path(__file__).resolve().parent), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        )
+        if proc.returncode != 0 or not result_path.stat().st_size:
+            tail = proc.stdout.decode("utf-8", "replace").strip().splitlines()[-3:]
+            return {"case": job["case"], "mode": job["mode"], "ok": False, "error": " | ".join(tail)}
+        return json.loads(result_path.read_text(encoding="utf-8"))
+    finally:
+        result_path.unlink(missing_ok=True)
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT),
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=10)
+        return out.stdout.decode().strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+# ======================
+# REPORT
+# ======================
+def print_table(results: list[dict]):
+    print(f"\n{'case':<12}{'mode':<11}{'scenes':>7}{'frames':>8}{'wall s':>9}{'fps':>10}"
+          f"{'x rt':>8}{'MB/s':>8}{'rss MB':>8}{'ffmpeg':>8}")
+    for r in results:
+        if not r.get("ok"):
+            print(f"{r['case']:<12}{r['mode']:<11}  ❌ {r.get('error', 'render failed')}")
+            continue
+        fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+        print(f"{r['case']:<12}{r['mode']:<11}{r['scenes']:>7}{r['frames']:>8}{r['wall_seconds']:>9.2f}"
+              f"{fmt(r['fps'], '>10.1f')}{fmt(r['realtime'], '>8.1f')}{fmt(r['output_mb_s'], '>8.2f')}"
+              f"{fmt(r['peak_rss_mb'], '>8.0f')}{fmt(r['peak_child_rss_mb'], '>8.0f')}")
+
+
+def compare(results: list[dict], baseline_path: Path):
+    """Wall-time ratio against an earlier results file, per (case, mode)."""
+    old = json.loads(baseline_path.read_text(encoding="utf-8"))
+    before = {(r["case"], r["mode"]): r for r in old.get("results", []) if r.get("ok")}
+    print(f"\n📊 Compared with {baseline_path.name} (commit {old.get('commit') or '?'}):")
+    for r in results:
+        prev = before.get((r["case"], r["mode"]))
+        if not r.get("ok") or not prev:
+            continue
+        ratio = prev["wall_seconds"] / r["wall_seconds"] if r["wall_seconds"] else float("inf")
+        mark = "▲" if ratio > 1.05 else "▼" if ratio < 0.95 else "="
+        print(f"  {mark} {r['case']:<12}{r['mode']:<11}{prev['wall_seconds']:>8.2f}s → {r['wall_seconds']:>8.2f}s"
+              f"  (×{ratio:.2f} speed)")
+
+# ======================
+# MAIN
+# ======================
+def main(cases: list[str], modes: list[str], repeat: int, scale: float, seed: int, chunks: int,
+         workdir: Path, out: Path, baseline: Path | None):
+    from support_scripts.ffmpeg_tools import find_ffmpeg
+
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg and any(m in FFMPEG_MODES for m in modes):
+        print("⚠️ ffmpeg not found: skipping modes " + ", ".join(m for m in modes if m in FFMPEG_MODES))
+        modes = [m for m in modes if m not in FFMPEG_MODES]
+
+    workdir.mkdir(parents=True, exist_ok=True)
+    results = []
+    for case in cases:
+        print(f"🧪 Preparing '{case}'...")
+        timeline = build_case(case, CASES[case], workdir / "data", seed, scale)
+        for mode in modes:
+            runs = []
+            for k in range(repeat):
+                job = {"case": case, "mode": mode, "timeline": str(timeline), "chunks": chunks,
+                       "resolution": CASES[case].get("resolution"),
+                       "out_dir": str(workdir / "out"), "cache_dir": str(workdir / "cache" / f"{case}_{mode}_{k}")}
+                Path(job["out_dir"]).mkdir(parents=True, exist_ok=True)
+                runs.append(run_job(job))
+            ok = [r for r in runs if r.get("ok")]
+            best = min(ok, key=lambda r: r["wall_seconds"]) if ok else runs[0]
+            if len(ok) > 1:
+                best["wall_seconds_all"] = [r["wall_seconds"] for r in ok]
+            results.append(best)
+            status = f"{best['wall_seconds']:.2f}s, {best['fps']} fps" if best.get("ok") else "failed"
+            print(f"⏱️  {case} / {mode}: {status}")
+
+    print_table(results)
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+        "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+        "opencv": cv2.__version__, "ffmpeg": ffmpeg, "seed": seed, "scale": scale, "repeat": repeat,
+        "chunks": chunks, "env": {k: v for k, v in os.environ.items() if k.startswith("RENDER_")},
+        "cases": {c: CASES[c] for c in cases}, "results": results,
+    }
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\n💾 Results saved: {out}")
+    if baseline:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark make_and_render on synthetic timelines.")
+    parser.add_argument("--cases", default=",".join(DEFAULT_CASES), help=f"Comma list of {', '.join(CASES)}.")
+    parser.add_argument("--modes", default=",".join(DEFAULT_MODES), help=f"Comma list of {', '.join(MODES)}.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per configuration (the fastest is kept).")
+    parser.add_argument("--quick", action="store_true", help="A quarter of the scenes of every case.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic images and durations.")
+    parser.add_argument("--chunks", type=int, default=1, help="--chunks passed to the renderer.")
+    parser.add_argument("--workdir", type=Path, default=None,
+                        help="Where images, segments and videos go (default: a temporary folder).")
+    parser.add_argument("--out", type=Path, default=None,
+                        help="Results JSON (default: output/benchmarks/render_<date>.json).")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier results JSON to compare against.")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    cli = parser.parse_args()
+
+    if cli.worker:
+        Path(cli.out).write_text(json.dumps(run_worker(json.loads(cli.worker))), encoding="utf-8")
+        sys.exit(0)
+
+    chosen_cases = [c.strip() for c in cli.cases.split(",") if c.strip()]
+    chosen_modes = [m.strip() for m in cli.modes.split(",") if m.strip()]
+    unknown = [c for c in chosen_cases if c not in CASES] + [m for m in chosen_modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown case/mode: {', '.join(unknown)}")
+    out_path = cli.out or BENCH_DIR / f"render_{datetime.now():%Y%m%d_%H%M%S}.json"
+    args = (chosen_cases, chosen_modes, max(1, cli.repeat), 0.25 if cli.quick else 1.0, cli.seed,
+            max(1, cli.chunks))
+    if cli.workdir:
+        main(*args, workdir=cli.workdir, out=out_path, baseline=cli.compare)
+    else:
+        with tempfile.TemporaryDirectory(prefix="render_bench_") as tmp:
+            main(*args, workdir=Path(tmp), out=out_path, baseline=cli.compare)
@@ -12,7 +12,7 @@ from openai import OpenAI
 from tqdm import tqdm
 
 from support_scripts.alerts import ring_bell
-from support_scripts.manifesto import ensure_entry, load_manifest, update_stage
+from support_scripts.manifesto import bases_where, ensure_entry, manifest_session, update_stage
 from support_scripts.paths import IMG_SUGGESTIONS_DIR, TXT_PROCESSED_DIR, SRT_OUTPUT_DIR
 from profiles import choose_profiles, list_profiles
 
@@ -237,13 +237,8 @@ def parse_json_suggestions(raw: str) -> list[str]:
 
 
 def list_ready_for_suggestions() -> list[str]:
-    mf = load_manifest()
     # Using 'txt' as done, as in your original simple code, for consistency.
-    return [
-        base
-        for base, info in mf.items()
-        if info.get("txt") == "done" and info.get("suggestions") != "done"
-    ]
+    return bases_where(txt="done", suggestions__ne="done")
 
 
 # ==========================
@@ -595,12 +590,15 @@ def main() -> None:
         profiles = list_profiles()
         chosen_profiles = choose_profiles(profiles)
 
-        for base in selected:
-            if use_global_mode:
-                process_base_full_script(base, global_suggestions, chosen_profiles)
-            else:
-                # Calls corrected Per-Scene mode
-                process_base(base, group_size, chosen_profiles, target_suggestions, use_full_context)
+        # Stage updates are batched by the session (periodic flush + one on exit);
+        # each base is still marked in_progress only when its own processing starts.
+        with manifest_session():
+            for base in selected:
+                if use_global_mode:
+                    process_base_full_script(base, global_suggestions, chosen_profiles)
+                else:
+                    # Calls corrected Per-Scene mode
+                    process_base(base, group_size, chosen_profiles, target_suggestions, use_full_context)
 
     finally:
         ring_bell("✅ Finished processing selected bases.")
@@ -0,0 +1,168 @@
+"""SRT cues rasterized once into alpha masks and blended onto the caption region of frames."""
+from __future__ import annotations
+
+import re
+import unicodedata
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+_TAG = re.compile(r"<[^>]+>|\{\\[^}]*\}")  # <i>, <font ...>, {\an8}
+_MAX_WIDTH = 0.9    # text block width, fraction of the frame
+_MARGIN = 0.06      # gap under the text block, fraction of the frame height
+_FONT_NAMES = ("DejaVuSans-Bold.ttf", "arialbd.ttf", "Arial Bold.ttf", "LiberationSans-Bold.ttf")
+
+
+def _srt_seconds(ts: str) -> float:
+    h, m, rest = ts.strip().replace(".", ",").split(":")
+    s, ms = rest.split(",")
+    return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000
+
+
+def read_cues(srt_path: Path) -> list[tuple[float, float, str]]:
+    """(start, end, text) of every SRT block with a timing line and some text."""
+    cues = []
+    content = Path(srt_path).read_text(encoding="utf-8-sig").replace("\r\n", "\n")
+    for block in content.strip().split("\n\n"):
+        lines = [l.strip() for l in block.splitlines() if l.strip()]
+        timing = next((i for i, l in enumerate(lines) if "-->" in l), None)
+        if timing is None:
+            continue
+        try:
+            start, end = (_srt_seconds(t) for t in lines[timing].split("-->"))
+        except ValueError:
+            continue
+        text = "\n".join(_TAG.sub("", l) for l in lines[timing + 1:]).strip()
+        if text and end > start:
+            cues.append((start, end, text))
+    return cues
+
+
+class CueOverlay:
+    """
+    One cue, pre-multiplied: out = roi * keep + paint on the text's bounding box
+    (x, y) only. keep/paint are float32, so a frame costs one multiply-add.
+    """
+
+    def __init__(self, x: int, y: int, outline: np.ndarray, text: np.ndarray, color=(255, 255, 255)):
+        a_out = outline.astype(np.float32)[..., None] / 255
+        a_txt = text.astype(np.float32)[..., None] / 255
+        self.x, self.y = x, y
+        self.h, self.w = outline.shape
+        # black outline under the text, then the text colour on top
+        self.keep = (1 - a_out) * (1 - a_txt)
+        self.paint = a_txt * np.array(color, dtype=np.float32) + 0.5
+
+    def roi(self, frame: np.ndarray) -> np.ndarray:
+        return frame[self.y:self.y + self.h, self.x:self.x + self.w]
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """Draws the cue onto `frame` in place and returns it."""
+        roi = self.roi(frame)
+        roi[...] = roi * self.keep + self.paint
+        return frame
+
+    @contextmanager
+    def drawn(self, frame: np.ndarray):
+        """Cue drawn onto `frame` for the duration of the block, then the region is restored."""
+        saved = self.roi(frame).copy()
+        try:
+            yield self.apply(frame)
+        finally:
+            self.roi(frame)[...] = saved
+
+
+@lru_cache(maxsize=None)
+def _pil_font(font_path: str, px: int):
+    try:
+        from PIL import ImageFont
+    except ImportError:
+        return None
+    for name in ((font_path,) if font_path else ()) + _FONT_NAMES:
+        try:
+            return ImageFont.truetype(name, px)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=px)  # Pillow >= 10.1
+    except TypeError:
+        return None
+
+
+def _wrap(text: str, fits) -> list[str]:
+    """Greedy word wrap of every line of `text` to what `fits`."""
+    out = []
+    for para in text.split("\n"):
+        line = ""
+        for word in para.split():
+            trial = f"{line} {word}".strip()
+            if line and not fits(trial):
+                out.append(line)
+                line = word
+            else:
+                line = trial
+        if line:
+            out.append(line)
+    return out
+
+
+def _masks_pil(font, text: str, max_w: int, stroke: int) -> tuple[np.ndarray, np.ndarray]:
+    from PIL import Image, ImageDraw
+
+    measure = ImageDraw.Draw(Image.new("L", (1, 1)))
+    lines = _wrap(text, lambda s: measure.textlength(s, font=font) + 2 * stroke <= max_w)
+    block = "\n".join(lines)
+    spacing = max(2, int(font.size) // 5)
+    opts = dict(font=font, align="center", spacing=spacing)
+    left, top, right, bottom = (int(round(v)) for v in
+                                measure.multiline_textbbox((0, 0), block, stroke_width=stroke, **opts))
+    masks = []
+    for width in (stroke, 0):
+        img = Image.new("L", (right - left, bottom - top), 0)
+        ImageDraw.Draw(img).multiline_text((-left, -top), block, fill=255, stroke_width=width, stroke_fill=255, **opts)
+        masks.append(np.asarray(img))
+    return masks[0], masks[1]
+
+
+def _masks_cv2(text: str, px: int, max_w: int, stroke: int) -> tuple[np.ndarray, np.ndarray]:
+    # Hershey fonts are ASCII only: drop the accents rather than print "?"
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    font, thick = cv2.FONT_HERSHEY_DUPLEX, max(1, px // 14)
+    scale = px / cv2.getTextSize("Hg", font, 1.0, thick)[0][1]
+    size = lambda s: cv2.getTextSize(s, font, scale, thick + 2 * stroke)
+    lines = _wrap(text, lambda s: size(s)[0][0] <= max_w)
+    if not lines:
+        return np.zeros((0, 0), np.uint8), np.zeros((0, 0), np.uint8)
+    line_h = int(px * 1.35)
+    width = max(size(l)[0][0] for l in lines) + 2 * stroke
+    height = line_h * len(lines) + 2 * stroke
+    outline, fill = np.zeros((height, width), np.uint8), np.zeros((height, width), np.uint8)
+    for k, line in enumerate(lines):
+        (lw, _), _ = size(line)
+        org = ((width - lw) // 2 + stroke, stroke + k * line_h + px)
+        cv2.putText(outline, line, org, font, scale, 255, thick + 2 * stroke, cv2.LINE_AA)
+        cv2.putText(fill, line, org, font, scale, 255, thick, cv2.LINE_AA)
+    return outline, fill
+
+
+@lru_cache(maxsize=512)
+def cue_overlay(text: str, frame_size: tuple[int, int], font_px: int, font_path: str = "") -> CueOverlay | None:
+    """
+    Overlay for `text` centred near the bottom of a `frame_size` frame, rasterized
+    once per text + style (TrueType through Pillow, else OpenCV's Hershey font).
+    """
+    fw, fh = frame_size
+    stroke = max(1, font_px // 12)
+    max_w = int(fw * _MAX_WIDTH)
+    font = _pil_font(font_path, font_px)
+    outline, fill = _masks_pil(font, text, max_w, stroke) if font else _masks_cv2(text, font_px, max_w, stroke)
+    # never larger than the frame (very long cues are cropped)
+    h, w = min(outline.shape[0], fh), min(outline.shape[1], fw)
+    if not h or not w:
+        return None
+    x = (fw - w) // 2
+    y = max(0, fh - int(fh * _MARGIN) - h)
+    return CueOverlay(x, y, outline[:h, :w], fill[:h, :w])
@@ -0,0 +1,105 @@
+"""Locating and running ffmpeg for the render stage (optional: callers fall back to OpenCV)."""
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+
+@lru_cache(maxsize=1)
+def find_ffmpeg() -> str | None:
+    """ffmpeg executable: $FFMPEG_BIN, then PATH, then the imageio-ffmpeg wheel if installed."""
+    env = os.getenv("FFMPEG_BIN")
+    if env and Path(env).exists():
+        return env
+    exe = shutil.which("ffmpeg")
+    if exe:
+        return exe
+    try:
+        import imageio_ffmpeg  # type: ignore
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+def run_ffmpeg(args: list[str], label: str = "ffmpeg", feed=None) -> bool:
+    """
+    Run ffmpeg quietly; print the tail of stderr on failure. `feed` (an iterable
+    of bytes) is streamed to ffmpeg's stdin, for inputs read from "-".
+    """
+    exe = find_ffmpeg()
+    if exe is None:
+        print(f"❌ [{label}] ffmpeg not found (install it or set FFMPEG_BIN).")
+        return False
+    cmd = [exe, "-hide_banner", "-loglevel", "error", "-nostdin", "-y", *args]
+    if feed is None:
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        returncode, stderr = proc.returncode, proc.stderr
+    else:
+        # stderr goes to a file: a full stderr pipe would block ffmpeg while we block on stdin
+        with tempfile.TemporaryFile() as err:
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=err)
+            try:
+                for chunk in feed:
+                    proc.stdin.write(chunk)
+            except BrokenPipeError:
+                pass  # ffmpeg stopped reading; its exit code and stderr tell why
+            except BaseException:
+                proc.kill()
+                proc.wait()
+                raise
+            finally:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+            returncode = proc.wait()
+            err.seek(0)
+            stderr = err.read()
+    if returncode != 0:
+        tail = stderr.decode("utf-8", "replace").strip().splitlines()[-5:]
+        print(f"❌ [{label}] ffmpeg exited with {returncode}: " + " | ".join(tail))
+        return False
+    return True
+
+
+def _quote(path: Path) -> str:
+    return "'" + str(Path(path).resolve()).replace("'", "'\\''") + "'"
+
+
+def write_concat_list(list_path: Path, items: list[tuple[Path, float | None]], framerate: int | None = None):
+    """
+    ffconcat script for the concat demuxer. `items` are (file, duration) pairs;
+    duration None means "play the whole file" (video segments). `framerate`
+    sets the image demuxer's time base for stills, which otherwise rounds
+    every scene start to 1/25 s.
+    """
+    lines = ["ffconcat version 1.0"]
+    for path, duration in items:
+        lines.append(f"file {_quote(path)}")
+        if framerate:
+            lines.append(f"option framerate {framerate}")
+        if duration is not None:
+            lines.append(f"duration {duration:.6f}")
+    if items and items[-1][1] is not None:
+        # the demuxer ignores the last still's duration unless the file is listed again
+        lines.append(f"file {_quote(items[-1][0])}")
+        if framerate:
+            lines.append(f"option framerate {framerate}")
+    Path(list_path).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def mux_audio(video: Path, audio: Path, out_path: Path, label: str = "mux") -> bool:
+    """
+    Video stream of `video` + first audio stream of `audio` into `out_path`, both
+    stream-copied (nothing is re-encoded or loaded into memory).
+    """
+    return run_ffmpeg(
+        ["-i", str(video), "-i", str(audio), "-map", "0:v:0", "-map", "1:a:0",
+         "-c", "copy", "-movflags", "+faststart", str(out_path)],
+        label=label,
+    )
+
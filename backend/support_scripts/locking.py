@@ -0,0 +1,118 @@
+"""Cross-process file locks and atomic file replacement."""
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+if os.name == "nt":  # pragma: no cover - exercised on Windows only
+    import msvcrt
+
+    def _try_lock(fh) -> bool:
+        try:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fh):
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _try_lock(fh) -> bool:
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fh):
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+class _HeldLock:
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.fh = None
+
+
+_HELD: dict[str, _HeldLock] = {}
+_HELD_GUARD = threading.Lock()
+
+
+@contextmanager
+def file_lock(lock_path: Path, timeout: float = 60.0, poll: float = 0.05):
+    """
+    Exclusive lock on `lock_path` shared by every process on the machine.
+    Re-entrant inside the same thread, so helpers that lock can call each other.
+    """
+    key = str(Path(lock_path).absolute())
+    with _HELD_GUARD:
+        held = _HELD.setdefault(key, _HeldLock())
+
+    with held.thread_lock:
+        if held.depth == 0:
+            Path(lock_path).parent.mkdir(parents=True, exist_ok=True)
+            fh = open(lock_path, "a+b")
+            deadline = time.monotonic() + timeout
+            while not _try_lock(fh):
+                if time.monotonic() >= deadline:
+                    fh.close()
+                    raise TimeoutError(f"Timed out waiting for lock {lock_path}")
+                time.sleep(poll)
+            held.fh = fh
+        held.depth += 1
+        try:
+            yield
+        finally:
+            held.depth -= 1
+            if held.depth == 0:
+                try:
+                    _unlock(held.fh)
+                finally:
+                    held.fh.close()
+                    held.fh = None
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8"):
+    """Write to a temp file in the same folder, fsync it, then rename over `path`."""
+    atomic_write_bytes(path, text.encode(encoding))
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Binary version of atomic_write_text()."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        try:
+            mode = path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_name, mode)  # mkstemp creates 0600 files
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        for attempt in range(10):
+            try:
+                os.replace(tmp_name, path)
+                break
+            except PermissionError:
+                # Windows refuses the rename while a reader has the file open.
+                if attempt == 9:
+                    raise
+                time.sleep(0.05)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,78 @@
+"""Cold shard for finished bases: a gzip-compressed JSON file kept next to the manifest."""
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+from .locking import atomic_write_bytes
+from .manifest_entry import clone_raw
+
+
+def _signature(path: Path):
+    try:
+        st = path.stat()
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
+
+
+class ManifestArchive:
+    """
+    {base: raw entry} for bases moved out of the hot manifest. Rarely written,
+    so each write rewrites the whole file; reads are cached until the file
+    changes. Callers hold the manifest lock while writing.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._data: dict | None = None
+        self._sig = None
+
+    def _current(self) -> dict:
+        sig = _signature(self.path)
+        if self._data is None or sig != self._sig:
+            data = {}
+            if sig is not None:
+                with gzip.open(self.path, "rb") as f:
+                    data = json.loads(f.read() or b"{}")
+            self._data, self._sig = data, sig
+        return self._data
+
+    def read(self) -> dict:
+        """Cached archive contents. Do not mutate."""
+        return self._current()
+
+    def load(self) -> dict:
+        return {base: clone_raw(entry) for base, entry in self._current().items()}
+
+    def get(self, base: str) -> dict | None:
+        entry = self._current().get(base)
+        return clone_raw(entry) if entry is not None else None
+
+    def has(self, base: str) -> bool:
+        return base in self._current()
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+    def _write(self, data: dict):
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        atomic_write_bytes(self.path, gzip.compress(payload, mtime=0))
+        self._data, self._sig = data, _signature(self.path)
+
+    def add(self, entries: dict):
+        """Insert or replace archived entries."""
+        if not entries:
+            return
+        data = dict(self._current())
+        data.update(entries)
+        self._write(data)
+
+    def remove(self, bases) -> int:
+        """Drop bases from the archive. Returns how many were there."""
+        data = dict(self._current())
+        removed = [b for b in dict.fromkeys(bases) if data.pop(b, None) is not None]
+        if removed:
+            self._write(data)
+        return len(removed)
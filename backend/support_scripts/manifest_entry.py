@@ -0,0 +1,195 @@
+"""Compact manifest entry record with lazy path resolution."""
+from __future__ import annotations
+
+import os
+from pathlib import Path, PurePath
+
+from .manifest_index import STAGES
+from .paths import ROOT, to_relative
+
+COUNTER_FIELDS = ("last_update", "sentences", "scenes", "images_saved", "group_size")
+PATH_FIELDS = ("txt_file", "audio_file", "srt_file", "video_file", "image_file")
+FIELDS = STAGES + COUNTER_FIELDS + PATH_FIELDS
+_FIELD_SET = frozenset(FIELDS)
+_PATH_SET = frozenset(PATH_FIELDS)
+_MISSING = object()
+
+
+def relativize(path) -> str:
+    """Project-relative form of a path, without touching the filesystem."""
+    s = os.fspath(path)
+    if not os.path.isabs(s):
+        return s  # already relative to the project root
+    try:
+        return str(PurePath(s).relative_to(ROOT))
+    except ValueError:
+        return to_relative(s)  # symlinks or "..": only now pay for resolve()
+
+
+def resolve(rel: str) -> str:
+    """Absolute form of a stored path (string join only)."""
+    return rel if os.path.isabs(rel) else str(ROOT / rel)
+
+
+def _copy_json(value):
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+
+def clone_raw(entry: dict) -> dict:
+    """Copy of a raw (JSON) entry that shares nothing mutable with it; much cheaper than deepcopy."""
+    return {k: _copy_json(v) if isinstance(v, (dict, list)) else v for k, v in entry.items()}
+
+
+class ManifestEntry:
+    """
+    One base of the manifest. Stage statuses, counters and artifact paths live
+    in fixed slots; anything else (audio_id, mode, ...) goes to a small dict.
+    Paths are kept project-relative and only made absolute when read, so
+    loading and saving never stat the filesystem.
+    Behaves like the dict entries it replaces (get, [], in, update, items...).
+    """
+
+    __slots__ = FIELDS + ("_extra",)
+
+    def __init__(self, data=None, **kwargs):
+        self._extra = {}  # unset slots simply stay unset
+        if data is not None:
+            self.update(data)
+        if kwargs:
+            self.update(kwargs)
+
+    # ---------- conversion ----------
+    @classmethod
+    def from_dict(cls, raw: dict) -> "ManifestEntry":
+        """Wrap a stored (raw) entry; its paths are already in stored form."""
+        entry = cls.__new__(cls)
+        entry._extra = extra = {}
+        setattr_ = object.__setattr__
+        for key, value in raw.items():
+            if isinstance(value, (dict, list)):
+                value = _copy_json(value)
+            if key in _FIELD_SET:
+                setattr_(entry, key, value)
+            else:
+                extra[key] = value
+        return entry
+
+    def to_dict(self) -> dict:
+        """Plain JSON-ready dict (paths project-relative)."""
+        out = {}
+        for name in FIELDS:
+            value = getattr(self, name, _MISSING)
+            if value is not _MISSING:
+                out[name] = value
+        out.update(self._extra)
+        return out
+
+    def raw(self, key: str, default=None):
+        """Stored value without path resolution."""
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        return self._extra.get(key, default)
+
+    def copy(self) -> "ManifestEntry":
+        return ManifestEntry.from_dict(self.to_dict())
+
+    # ---------- mapping protocol ----------
+    def __getitem__(self, key: str):
+        if key in _FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            if value is _MISSING:
+                raise KeyError(key)
+            if key in _PATH_SET and isinstance(value, str):
+                return resolve(value)
+            return value
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value):
+        if key in _FIELD_SET:
+            if key in _PATH_SET and isinstance(value, (str, Path)):
+                value = relativize(value)
+            object.__setattr__(self, key, value)
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in _FIELD_SET:
+            try:
+                object.__delattr__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key) -> bool:
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return key in self._extra
+
+    def __iter__(self):
+        for name in FIELDS:
+            if hasattr(self, name):
+                yield name
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for name in FIELDS if hasattr(self, name)) + len(self._extra)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ManifestEntry):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == ManifestEntry(other).to_dict()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ManifestEntry({self.to_dict()!r})"
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[k] for k in self]
+
+    def items(self):
+        return [(k, self[k]) for k in self]
+
+    def setdefault(self, key: str, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, *default):
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return value
+
+    def update(self, other=None, **kwargs):
+        if other is not None:
+            pairs = other.items() if hasattr(other, "items") else other
+            for key, value in pairs:
+                self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+
+def as_raw(entry) -> dict:
+    """JSON-ready dict for a ManifestEntry or a plain (possibly absolute-path) dict."""
+    if isinstance(entry, ManifestEntry):
+        return entry.to_dict()
+    return clone_raw(ManifestEntry(entry).to_dict())
@@ -0,0 +1,119 @@
+"""Change feed: every manifest stage transition as one line in a tailable JSONL file."""
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+from .locking import file_lock
+from .manifest_index import STAGES
+from .paths import MANIFEST_EVENTS_PATH
+
+EVENTS_ENABLED = os.getenv("MANIFEST_EVENTS", "1") != "0"
+# Rotate to <file>.1 past this size; followers notice and reopen.
+EVENTS_MAX_BYTES = int(os.getenv("MANIFEST_EVENTS_MAX_BYTES", str(5 * 1024 * 1024)))
+COUNTER_KEYS = ("sentences", "scenes", "images_saved", "total_suggestions", "group_size", "frames")
+_LOCK_PATH = MANIFEST_EVENTS_PATH.with_name(MANIFEST_EVENTS_PATH.name + ".lock")
+
+
+def stage_transitions(base: str, old: dict | None, new: dict | None) -> list[dict]:
+    """Events for every stage whose status differs between two versions of an entry."""
+    old = old or {}
+    entry = new or {}
+    counters = {k: entry[k] for k in COUNTER_KEYS if k in entry}
+    ts = time.strftime("%Y-%m-%dT%H:%M:%S")
+    events = []
+    for stage in STAGES:
+        before, after = old.get(stage), entry.get(stage)
+        if before != after:
+            events.append({
+                "ts": ts,
+                "base": base,
+                "stage": stage,
+                "old": before,
+                "new": after,
+                "counters": counters,
+            })
+    return events
+
+
+def publish(events: list[dict], path: Path = MANIFEST_EVENTS_PATH):
+    """Append events to the feed (one write per batch)."""
+    if not events or not EVENTS_ENABLED:
+        return
+    payload = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events).encode("utf-8")
+    try:
+        with file_lock(_LOCK_PATH, timeout=5):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "ab") as f:
+                f.write(payload)
+                size = f.tell()
+            if size > EVENTS_MAX_BYTES:
+                os.replace(path, path.with_name(path.name + ".1"))
+    except Exception as e:  # the feed must never break a stage
+        print(f"⚠️ Failed to publish manifest events: {e}")
+
+
+def follow(stages=None, bases=None, from_start: bool = False, poll: float = 0.25,
+           path: Path = MANIFEST_EVENTS_PATH):
+    """
+    Generator yielding events as they are published (like `tail -f`).
+    Filters by stage/base names when given. Survives rotation.
+    """
+    stages = set(stages) if stages else None
+    bases = set(bases) if bases else None
+    fh, ino, buf = None, None, b""
+    while True:
+        if fh is None:
+            try:
+                fh = open(path, "rb")
+                ino = os.fstat(fh.fileno()).st_ino
+                if not from_start:
+                    fh.seek(0, os.SEEK_END)
+                from_start = True  # after a rotation, read the new file from its start
+            except FileNotFoundError:
+                from_start = True  # everything in the file once it appears is new
+                time.sleep(poll)
+                continue
+        chunk = fh.read()
+        if chunk:
+            buf += chunk
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if stages and event.get("stage") not in stages:
+                    continue
+                if bases and event.get("base") not in bases:
+                    continue
+                yield event
+            continue
+        try:
+            rotated = os.stat(path).st_ino != ino
+        except FileNotFoundError:
+            rotated = True
+        if rotated:
+            fh.close()
+            fh, buf = None, b""
+            continue
+        time.sleep(poll)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print manifest stage transitions as they happen.")
+    parser.add_argument("--stage", action="append", help="Only these stages (repeatable).")
+    parser.add_argument("--base", action="append", help="Only these bases (repeatable).")
+    parser.add_argument("--from-start", action="store_true", help="Replay the current file first.")
+    args = parser.parse_args()
+    try:
+        for event in follow(stages=args.stage, bases=args.base, from_start=args.from_start):
+            print(json.dumps(event, ensure_ascii=False), flush=True)
+    except KeyboardInterrupt:
+        pass
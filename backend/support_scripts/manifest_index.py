@@ -0,0 +1,108 @@
+"""Secondary index over the manifest: stage -> status -> bases."""
+from __future__ import annotations
+
+# Status fields that can be queried with bases_where().
+STAGES = ("txt", "audio", "audio_downloaded", "srt", "suggestions", "images", "timeline", "video")
+_OPS = ("eq", "ne", "in")
+
+
+def parse_criteria(criteria: dict) -> list[tuple[str, str, object]]:
+    """
+    Turn bases_where() keyword arguments into (stage, op, value) triples.
+    `images="done"` -> eq, `video__ne="done"` -> ne, `audio__in=("done", "error")` -> in.
+    A value of None matches bases where the stage is not set.
+    """
+    parsed = []
+    for key, value in criteria.items():
+        stage, _, op = key.partition("__")
+        op = op or "eq"
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage '{stage}' (expected one of {', '.join(STAGES)})")
+        if op not in _OPS:
+            raise ValueError(f"Unknown operator '{op}' in '{key}' (expected eq, ne or in)")
+        if op == "in":
+            value = tuple(value)
+        parsed.append((stage, op, value))
+    return parsed
+
+
+def _matches(status, op: str, value) -> bool:
+    if op == "eq":
+        return status == value
+    if op == "ne":
+        return status != value
+    return status in value
+
+
+class StageIndex:
+    """
+    In-memory index kept next to a loaded manifest. `set()` updates one base in
+    O(stages); `query()` starts from the smallest matching bucket, so it costs
+    time proportional to the matches rather than to the whole manifest.
+    """
+
+    def __init__(self, raw: dict | None = None):
+        self._order: dict[str, int] = {}
+        self._status: dict[str, dict[str, object]] = {}
+        self._buckets: dict[str, dict[object, set[str]]] = {s: {} for s in STAGES}
+        self._seq = 0
+        for base, entry in (raw or {}).items():
+            self.set(base, entry)
+
+    def __contains__(self, base: str) -> bool:
+        return base in self._status
+
+    def __len__(self) -> int:
+        return len(self._status)
+
+    def set(self, base: str, entry: dict | None):
+        """Index (or, with entry=None, drop) one base."""
+        old = self._status.pop(base, None)
+        if old is not None:
+            for stage, status in old.items():
+                bucket = self._buckets[stage].get(status)
+                if bucket is not None:
+                    bucket.discard(base)
+                    if not bucket:
+                        del self._buckets[stage][status]
+        if entry is None:
+            self._order.pop(base, None)
+            return
+        if base not in self._order:
+            self._seq += 1
+            self._order[base] = self._seq
+        status = {s: entry.get(s) for s in STAGES}
+        self._status[base] = status
+        for stage, value in status.items():
+            try:
+                self._buckets[stage].setdefault(value, set()).add(base)
+            except TypeError:  # unhashable junk in a status field
+                continue
+
+    def _bucket(self, stage: str, value) -> set[str]:
+        try:
+            return self._buckets[stage].get(value, set())
+        except TypeError:
+            return set()
+
+    def query(self, criteria: dict) -> list[str]:
+        """Bases matching every criterion, in manifest order."""
+        parsed = parse_criteria(criteria)
+        candidates = None
+        for stage, op, value in parsed:
+            if op == "eq":
+                bucket = self._bucket(stage, value)
+            elif op == "in":
+                bucket = set().union(*(self._bucket(stage, v) for v in value)) if value else set()
+            else:
+                continue
+            if candidates is None or len(bucket) < len(candidates):
+                candidates = bucket
+        if candidates is None:
+            candidates = self._status.keys()
+        hits = [
+            b for b in candidates
+            if all(_matches(self._status[b].get(stage), op, value) for stage, op, value in parsed)
+        ]
+        hits.sort(key=self._order.__getitem__)
+        return hits
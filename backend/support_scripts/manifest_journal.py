@@ -0,0 +1,269 @@
+"""Append-only manifest storage: manifesto.json snapshot + JSONL journal of changes."""
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+
+from .locking import atomic_write_text
+from .manifest_entry import clone_raw
+from .manifest_index import StageIndex
+from .throttle import Throttle
+
+# Fold the journal into a fresh snapshot once it grows past this many bytes.
+JOURNAL_MAX_BYTES = int(os.getenv("MANIFEST_JOURNAL_MAX_BYTES", str(1024 * 1024)))
+# fsync every append (crash-safe); set MANIFEST_JOURNAL_FSYNC=0 to trade that for speed.
+JOURNAL_FSYNC = os.getenv("MANIFEST_JOURNAL_FSYNC", "1") != "0"
+# Rewrite manifesto.json (snapshot + journal) at exit when this process wrote, so the
+# UI and tools that read the JSON file see current data between compactions.
+SNAPSHOT_REFRESH = os.getenv("MANIFEST_JSON_EXPORT", "1") != "0"
+# Opt-in: also refresh it while writing, at most once per this many seconds. Every
+# refresh rewrites the whole file, which is what the journal avoids, so 0 (off) by default.
+SNAPSHOT_REFRESH_INTERVAL = float(os.getenv("MANIFEST_JOURNAL_REFRESH_INTERVAL", "0"))
+
+
+def _signature(path: Path):
+    # ctime_ns too: an atomic replace can reuse a freed inode within one mtime tick
+    try:
+        st = path.stat()
+        return (st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
+
+
+def diff_entry(old: dict | None, new: dict) -> tuple[dict, list[str]]:
+    """Keys to set and keys to drop to turn `old` into `new`."""
+    old = old or {}
+    changed = {k: v for k, v in new.items() if k not in old or old[k] != v}
+    removed = [k for k in old if k not in new]
+    return changed, removed
+
+
+def apply_record(state: dict, rec: dict):
+    base = rec.get("base")
+    if base is None:
+        return
+    if rec.get("deleted"):
+        state.pop(base, None)
+        return
+    entry = state.setdefault(base, {})
+    entry.update(rec.get("set") or {})
+    for k in rec.get("unset") or ():
+        entry.pop(k, None)
+
+
+class JournalManifestStore:
+    """
+    Every change is one appended JSONL line ({"ts", "base", "set", "unset"} or
+    {"ts", "base", "deleted"}). State = snapshot + journal; records are
+    idempotent, so replaying a line twice is harmless. Readers keep their
+    position and only replay the new tail on the next load.
+    """
+
+    name = "journal"
+
+    def __init__(self, snapshot_path: Path, journal_path: Path, history_path: Path | None = None,
+                 max_bytes: int = JOURNAL_MAX_BYTES):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path)
+        self.history_path = Path(history_path) if history_path else None
+        self.max_bytes = max_bytes
+        self._state: dict | None = None
+        self._snapshot_sig = None
+        self._offset = 0
+        self._index: StageIndex | None = None
+        self._stale = False  # this process appended since the snapshot was last written
+        self._refresh: Throttle | None = None
+        if SNAPSHOT_REFRESH:
+            if SNAPSHOT_REFRESH_INTERVAL > 0:
+                self._refresh = Throttle(self._refresh_if_stale, SNAPSHOT_REFRESH_INTERVAL)
+            atexit.register(self._refresh_if_stale)
+
+    # ---------- reading ----------
+    def _read_tail(self, state: dict, offset: int) -> int:
+        """Replay complete journal lines after `offset`; returns the new offset."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+        end = data.rfind(b"\n") + 1  # a torn last line (crash mid-append) is left for later
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            apply_record(state, rec)
+            self._reindex(state, rec.get("base"))
+        return offset + end
+
+    def _reindex(self, state: dict, base):
+        if self._index is not None and base is not None:
+            self._index.set(base, state.get(base))
+
+    def _current(self) -> dict:
+        snap_sig = _signature(self.snapshot_path)
+        journal_size = (_signature(self.journal_path) or (0, 0, 0))[2]
+        if self._state is None or snap_sig != self._snapshot_sig or journal_size < self._offset:
+            # first read, or another process compacted: start from the snapshot
+            state = {}
+            if self.snapshot_path.exists():
+                state = json.loads(self.snapshot_path.read_text(encoding="utf-8") or "{}")
+            self._state, self._snapshot_sig, self._offset = state, snap_sig, 0
+            self._index = None
+        if journal_size > self._offset:
+            self._offset = self._read_tail(self._state, self._offset)
+        return self._state
+
+    def load(self) -> dict:
+        return {base: clone_raw(entry) for base, entry in self._current().items()}
+
+    def read(self) -> dict:
+        """Current state, shared with the store (replays only the new journal tail). Do not mutate."""
+        return self._current()
+
+    def _current_index(self) -> StageIndex:
+        state = self._current()
+        if self._index is None:
+            self._index = StageIndex(state)
+        return self._index
+
+    def query(self, criteria: dict) -> list[str]:
+        return self._current_index().query(criteria)
+
+    def has(self, base: str) -> bool:
+        return base in self._current()
+
+    def get(self, base: str) -> dict | None:
+        entry = self._current().get(base)
+        return clone_raw(entry) if entry is not None else None
+
+    # ---------- writing ----------
+    def _append(self, records: list[dict]):
+        if not records:
+            return
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_path, "ab") as f:
+            if f.tell() > self._offset:
+                # torn line from a crashed writer: terminate it so ours parses
+                payload = b"\n" + payload
+            f.write(payload)
+            f.flush()
+            if JOURNAL_FSYNC:
+                os.fsync(f.fileno())
+            self._offset = f.tell()
+
+    def save(self, raw: dict):
+        from .manifesto import manifest_lock
+        with manifest_lock():
+            self._write_snapshot(raw)
+
+    def apply(self, bases, fn):
+        from .manifesto import manifest_lock
+        with manifest_lock():
+            state = self._current()
+            wanted = list(dict.fromkeys(bases))
+            entries = {b: clone_raw(state[b]) for b in wanted if b in state}
+            result = fn(entries)
+            ts = time.strftime("%Y-%m-%dT%H:%M:%S")
+            records = []
+            for b in wanted:
+                if b in entries:
+                    changed, removed = diff_entry(state.get(b), entries[b])
+                    if b not in state or changed or removed:
+                        rec = {"ts": ts, "base": b, "set": changed}
+                        if removed:
+                            rec["unset"] = removed
+                        records.append(rec)
+                elif b in state:
+                    records.append({"ts": ts, "base": b, "deleted": True})
+            self._append(records)
+            self._stale = self._stale or bool(records)
+            for rec in records:
+                apply_record(state, rec)
+                self._reindex(state, rec["base"])
+            if self._offset >= self.max_bytes:
+                self._write_snapshot(state)
+        if records and self._refresh is not None:
+            self._refresh()
+        return result
+
+    def compact(self) -> int:
+        """Fold the journal into a fresh snapshot. Returns the bytes folded."""
+        from .manifesto import manifest_lock
+        with manifest_lock():
+            state = self._current()
+            folded = self._offset
+            self._write_snapshot(state)
+        return folded
+
+    def _refresh_if_stale(self):
+        if self._stale:
+            self._stale = False
+            try:
+                self.refresh_snapshot()
+            except Exception as e:
+                self._stale = True
+                print(f"⚠️ Failed to refresh the manifest snapshot: {e}")
+
+    def refresh_snapshot(self):
+        """
+        Rewrite the snapshot as snapshot + journal, leaving the journal in place.
+        Readers reload the new snapshot and replay the journal over it, which the
+        idempotent records allow. Built from the files, not the shared state, so
+        it is safe on the refresh timer thread.
+        """
+        from .manifesto import manifest_lock
+        with manifest_lock():
+            state = {}
+            if self.snapshot_path.exists():
+                state = json.loads(self.snapshot_path.read_text(encoding="utf-8") or "{}")
+            try:
+                data = self.journal_path.read_bytes()
+            except FileNotFoundError:
+                data = b""
+            for line in data[:data.rfind(b"\n") + 1].splitlines():
+                try:
+                    apply_record(state, json.loads(line))
+                except ValueError:
+                    continue
+            atomic_write_text(self.snapshot_path, json.dumps(state, indent=2, ensure_ascii=False))
+
+    def _write_snapshot(self, raw: dict):
+        """Write the snapshot, move the journal into history, start an empty journal."""
+        atomic_write_text(self.snapshot_path, json.dumps(raw, indent=2, ensure_ascii=False))
+        if self.journal_path.exists():
+            if self.history_path is not None and self.journal_path.stat().st_size:
+                with gzip.open(self.history_path, "ab") as hist:
+                    hist.write(self.journal_path.read_bytes())
+            self.journal_path.write_bytes(b"")
+        self._state = {base: clone_raw(entry) for base, entry in raw.items()}
+        self._stale = False
+        self._snapshot_sig = _signature(self.snapshot_path)
+        self._offset = 0
+        self._index = None
+
+    # ---------- debugging ----------
+    def iter_records(self, include_history: bool = True):
+        """Yield every journal record, oldest first (history, then the live journal)."""
+        sources = []
+        if include_history and self.history_path is not None and self.history_path.exists():
+            sources.append(gzip.open(self.history_path, "rb"))
+        if self.journal_path.exists():
+            sources.append(open(self.journal_path, "rb"))
+        for src in sources:
+            with src:
+                for line in src:
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
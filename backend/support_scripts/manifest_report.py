@@ -0,0 +1,110 @@
+"""Per-stage duration and throughput report built from the manifest's stage timings."""
+from __future__ import annotations
+
+import json
+
+from .manifest_index import STAGES
+
+# Throughput shown per stage: (counter, label, seconds per unit of time).
+RATES = {
+    "srt": ("sentences", "sentences/min", 60.0),
+    "suggestions": ("scenes", "scenes/min", 60.0),
+    "images": ("images_saved", "images/min", 60.0),
+    "timeline": ("scenes", "scenes/min", 60.0),
+    "video": ("frames", "frames/s", 1.0),
+}
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Linear-interpolated percentile of an unsorted list (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _summary(values: list[float]) -> dict:
+    out = {"count": len(values)}
+    if values:
+        out["mean"] = sum(values) / len(values)
+        for p in PERCENTILES:
+            out[f"p{p}"] = percentile(values, p)
+    return out
+
+
+def throughput_report(entries: dict) -> dict:
+    """
+    {stage: {"runs", "errors", "total_seconds", "seconds": {...}, "rate": {...}}}
+    over every finished stage run found in `entries` (raw manifest entries).
+    """
+    report = {}
+    for stage in STAGES:
+        seconds, rates, errors = [], [], 0
+        counter, label, per = RATES.get(stage, (None, None, 1.0))
+        for entry in entries.values():
+            timing = (entry.get("timings") or {}).get(stage)
+            if not timing or "seconds" not in timing:
+                continue
+            if timing.get("status") == "error":
+                errors += 1
+                continue
+            secs = float(timing["seconds"])
+            seconds.append(secs)
+            items = (timing.get("items") or {}).get(counter) if counter else None
+            if items and secs > 0:
+                rates.append(items * per / secs)
+        if not seconds and not errors:
+            continue
+        report[stage] = {
+            "runs": len(seconds),
+            "errors": errors,
+            "total_seconds": round(sum(seconds), 3),
+            "seconds": _summary(seconds),
+        }
+        if rates:
+            report[stage]["rate"] = {"unit": label, **_summary(rates)}
+    return report
+
+
+def _fmt(value) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_report(report: dict):
+    if not report:
+        print("📭 No stage timings recorded yet.")
+        return
+    print(f"{'stage':<12}{'runs':>6}{'err':>5}{'total h':>9}{'p50 s':>9}{'p90 s':>9}{'p99 s':>9}   throughput (p50 / p90)")
+    for stage, row in report.items():
+        sec = row["seconds"]
+        rate = row.get("rate")
+        tput = f"{_fmt(rate['p50'])} / {_fmt(rate['p90'])} {rate['unit']}" if rate else "-"
+        print(
+            f"{stage:<12}{row['runs']:>6}{row['errors']:>5}{row['total_seconds'] / 3600:>9.2f}"
+            f"{_fmt(sec.get('p50')):>9}{_fmt(sec.get('p90')):>9}{_fmt(sec.get('p99')):>9}   {tput}"
+        )
+    bottleneck = max(report, key=lambda s: report[s]["total_seconds"])
+    print(f"\n🐢 Bottleneck: {bottleneck} ({report[bottleneck]['total_seconds'] / 3600:.2f} h total)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .manifesto import get_archive, get_store
+
+    parser = argparse.ArgumentParser(description="Per-stage throughput across bases.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument("--no-archive", action="store_true", help="Skip archived (finished) bases.")
+    args = parser.parse_args()
+
+    entries = {} if args.no_archive else dict(get_archive().read())
+    entries.update(get_store().read())
+    report = throughput_report(entries)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -0,0 +1,289 @@
+"""SQLite manifest storage: one row per base, single-row upserts in WAL mode."""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .manifest_entry import clone_raw
+from .manifest_index import STAGES, parse_criteria
+from .throttle import Throttle
+
+# Export manifesto.json after writes (at most once per interval) and at process
+# exit, so the UI and tools that read the JSON file keep seeing current data.
+JSON_EXPORT_ON_EXIT = os.getenv("MANIFEST_JSON_EXPORT", "1") != "0"
+JSON_EXPORT_INTERVAL = float(os.getenv("MANIFEST_JSON_EXPORT_INTERVAL", "2"))
+_SQL_CHUNK = 500  # stays below SQLITE_MAX_VARIABLE_NUMBER on old builds
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifest (
+    base TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS stage_index (
+    base TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT,
+    PRIMARY KEY (base, stage)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS stage_index_lookup ON stage_index (stage, status);
+"""
+
+
+def _dump(entry: dict) -> str:
+    return json.dumps(entry, ensure_ascii=False)
+
+
+class SqliteManifestStore:
+    """Transactional manifest backend. Same load/save/apply contract as the JSON store."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path: Path, json_path: Path | None = None):
+        self.db_path = Path(db_path)
+        self.json_path = Path(json_path) if json_path else None
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._writes = 0  # bumped on our own commits; PRAGMA data_version covers other connections
+        self._cache: dict | None = None
+        self._cache_version = None
+        self._export: Throttle | None = None
+        if self.json_path and JSON_EXPORT_ON_EXIT:
+            self._export = Throttle(self._export_if_dirty, JSON_EXPORT_INTERVAL)
+            atexit.register(self._export_if_dirty)
+
+    # ---------- connection ----------
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.db_path), timeout=30, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._import_json_once()
+            self._build_stage_index_once()
+        return self._conn
+
+    def _import_json_once(self):
+        """Seed the database from manifesto.json the first time it is opened."""
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            done = conn.execute("SELECT value FROM meta WHERE key = 'json_imported'").fetchone()
+            if done is None:
+                imported = 0
+                if self.json_path and self.json_path.exists():
+                    raw = json.loads(self.json_path.read_text(encoding="utf-8") or "{}")
+                    now = time.strftime("%Y-%m-%dT%H:%M:%S")
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO manifest (base, data, updated_at) VALUES (?, ?, ?)",
+                        [(b, _dump(e), now) for b, e in raw.items()],
+                    )
+                    imported = len(raw)
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('json_imported', ?)", (str(imported),)
+                )
+                if imported:
+                    print(f"🗄️  Imported {imported} manifest entries into {self.db_path.name}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _build_stage_index_once(self):
+        """Backfill stage_index for databases created before it existed."""
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'stage_index'").fetchone() is None:
+                conn.execute("DELETE FROM stage_index")
+                for base, data in conn.execute("SELECT base, data FROM manifest").fetchall():
+                    self._index_rows(conn, base, json.loads(data))
+                conn.execute("INSERT INTO meta (key, value) VALUES ('stage_index', '1')")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _index_rows(conn, base: str, entry: dict | None):
+        conn.execute("DELETE FROM stage_index WHERE base = ?", (base,))
+        if entry is None:
+            return
+        rows = [(base, s, str(entry[s])) for s in STAGES if entry.get(s) is not None]
+        if rows:
+            conn.executemany("INSERT INTO stage_index (base, stage, status) VALUES (?, ?, ?)", rows)
+
+    # ---------- queries ----------
+    def query(self, criteria: dict) -> list[str]:
+        """bases_where() in SQL; the most selective equality drives the (stage, status) index."""
+        parsed = parse_criteria(criteria)
+        driver = next(((st, v) for st, op, v in parsed if op == "eq" and v is not None), None)
+        where, params = [], []
+        for stage, op, value in parsed:
+            if op == "in":
+                present = [str(v) for v in value if v is not None]
+                clauses = []
+                if present:
+                    marks = ",".join("?" * len(present))
+                    clauses.append(f"m.base IN (SELECT base FROM stage_index WHERE stage = ? AND status IN ({marks}))")
+                    params += [stage, *present]
+                if any(v is None for v in value):
+                    clauses.append("m.base NOT IN (SELECT base FROM stage_index WHERE stage = ?)")
+                    params.append(stage)
+                where.append("(" + " OR ".join(clauses) + ")" if clauses else "0")
+            elif value is None:
+                neg = "" if op == "ne" else "NOT "
+                where.append(f"m.base {neg}IN (SELECT base FROM stage_index WHERE stage = ?)")
+                params.append(stage)
+            elif (stage, value) == driver and op == "eq":
+                continue
+            else:
+                neg = "NOT " if op == "ne" else ""
+                where.append(f"m.base {neg}IN (SELECT base FROM stage_index WHERE stage = ? AND status = ?)")
+                params += [stage, str(value)]
+        if driver:
+            sql = ("SELECT m.base FROM stage_index s JOIN manifest m ON m.base = s.base "
+                   "WHERE s.stage = ? AND s.status = ?")
+            params = [driver[0], str(driver[1]), *params]
+        else:
+            sql = "SELECT m.base FROM manifest m WHERE 1"
+        if where:
+            sql += " AND " + " AND ".join(where)
+        sql += " ORDER BY m.rowid"
+        with self._lock:
+            return [row[0] for row in self._connect().execute(sql, params).fetchall()]
+
+    def has(self, base: str) -> bool:
+        with self._lock:
+            return self._connect().execute(
+                "SELECT 1 FROM manifest WHERE base = ?", (base,)
+            ).fetchone() is not None
+
+    def get(self, base: str) -> dict | None:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT data FROM manifest WHERE base = ?", (base,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # ---------- store contract ----------
+    def load(self) -> dict:
+        return {base: clone_raw(entry) for base, entry in self.read().items()}
+
+    def read(self) -> dict:
+        """Parsed manifest, re-read only when the database changed. Do not mutate."""
+        with self._lock:
+            conn = self._connect()
+            version = (conn.execute("PRAGMA data_version").fetchone()[0], self._writes)
+            if self._cache is None or version != self._cache_version:
+                rows = conn.execute("SELECT base, data FROM manifest ORDER BY rowid").fetchall()
+                self._cache = {base: json.loads(data) for base, data in rows}
+                self._cache_version = version
+            return self._cache
+
+    def save(self, raw: dict):
+        """Replace the whole manifest (only rows that differ are written)."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = dict(conn.execute("SELECT base, data FROM manifest").fetchall())
+                self._write(conn, current, raw, deleted=[b for b in current if b not in raw])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self._schedule_export()
+
+    def apply(self, bases, fn):
+        """Read-modify-write of the given bases inside one IMMEDIATE transaction."""
+        wanted = list(dict.fromkeys(bases))
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = self._fetch(conn, wanted)
+                entries = {b: json.loads(d) for b, d in current.items()}
+                result = fn(entries)
+                updates = {b: entries[b] for b in wanted if b in entries}
+                deleted = [b for b in wanted if b in current and b not in entries]
+                self._write(conn, current, updates, deleted)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self._schedule_export()
+        return result
+
+    # ---------- internals ----------
+    @staticmethod
+    def _fetch(conn: sqlite3.Connection, bases: list[str]) -> dict[str, str]:
+        found: dict[str, str] = {}
+        for i in range(0, len(bases), _SQL_CHUNK):
+            chunk = bases[i:i + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            found.update(conn.execute(
+                f"SELECT base, data FROM manifest WHERE base IN ({marks})", chunk
+            ).fetchall())
+        return found
+
+    def _write(self, conn, current: dict[str, str], updates: dict, deleted: list[str]):
+        now = time.strftime("%Y-%m-%dT%H:%M:%S")
+        rows = []
+        for base, entry in updates.items():
+            data = _dump(entry)
+            if current.get(base) != data:
+                rows.append((base, data, now))
+        if rows:
+            conn.executemany(
+                "INSERT INTO manifest (base, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(base) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                rows,
+            )
+            for base, _, _ in rows:
+                self._index_rows(conn, base, updates[base])
+        if deleted:
+            conn.executemany("DELETE FROM manifest WHERE base = ?", [(b,) for b in deleted])
+            for base in deleted:
+                self._index_rows(conn, base, None)
+        if rows or deleted:
+            self._dirty = True
+            self._writes += 1
+
+    def _schedule_export(self):
+        if self._dirty and self._export is not None:
+            self._export()
+
+    def _export_if_dirty(self):
+        # may run on the export timer thread: take the state and clear the flag together
+        with self._lock:
+            if not self._dirty or self.json_path is None:
+                return
+            raw = self.read()
+            self._dirty = False
+        try:
+            from .manifesto import JsonManifestStore
+            JsonManifestStore(self.json_path).save(raw)
+        except Exception as e:
+            self._dirty = True
+            print(f"⚠️ Failed to export manifest JSON: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,105 +1,724 @@
-# manifesto.py
-import json
-import time
-
-from pathlib import Path
-from .paths import MANIFEST_PATH
-
-
-# ==========================
-# CORE LOAD/SAVE
-# ==========================
-def _deserialize_paths(data):
-    """Recursively convert known path keys to absolute Path objects."""
-    if isinstance(data, dict):
-        for k, v in data.items():
-            if k in ("txt_file", "audio_file", "srt_file", "video_file", "image_file") and isinstance(v, str):
-                from .paths import to_absolute
-                data[k] = str(to_absolute(v))  # Keep as string for JSON compatibility in other parts, but absolute
-            elif isinstance(v, (dict, list)):
-                _deserialize_paths(v)
-    elif isinstance(data, list):
-        for item in data:
-            _deserialize_paths(item)
-    return data
-
-
-def _serialize_paths(data):
-    """Recursively convert known path keys to relative strings."""
-    if isinstance(data, dict):
-        new_data = {}
-        for k, v in data.items():
-            if k in ("txt_file", "audio_file", "srt_file", "video_file", "image_file") and isinstance(v, (str, Path)):
-                from .paths import to_relative
-                new_data[k] = to_relative(v)
-            elif isinstance(v, dict):
-                new_data[k] = _serialize_paths(v)
-            elif isinstance(v, list):
-                new_data[k] = _serialize_paths(v)
-            else:
-                new_data[k] = v
-        return new_data
-    elif isinstance(data, list):
-        return [_serialize_paths(item) for item in data]
-    return data
-
-
-def load_manifest() -> dict:
-    if MANIFEST_PATH.exists():
-        data = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
-        return _deserialize_paths(data)
-    return {}
-
-
-def save_manifest(mf: dict):
-    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
-    clean_mf = _serialize_paths(mf)
-    MANIFEST_PATH.write_text(json.dumps(clean_mf, indent=2, ensure_ascii=False), encoding="utf-8")
-
-
-# ==========================
-# HELPERS
-# ==========================
-def ensure_entry(base: str):
-    mf = load_manifest()
-    if base not in mf:
-        mf[base] = {
-            "txt": "ready",          # TXT already in inbox
-            "audio": "pending",
-            "audio_downloaded": "pending", # audio downloaded
-            "srt": "pending",        # subtitle not yet generated
-            "suggestions": "pending",# prompts not yet generated
-            "images": "pending",     # images not yet made
-            "timeline": "pending",   # timeline JSON not yet created
-            "video": "pending",      # final render not yet done
-            "last_update": time.strftime("%Y-%m-%dT%H:%M:%S"),
-            "sentences": 0,
-            "scenes": 0,
-            "images_saved": 0,
-            "group_size": 1
-        }
-        save_manifest(mf)
-    return mf
-def update_stage(base: str, stage: str, status: str, extra: dict | None = None):
-    """
-    Updates the status of a specific stage of the base.
-    """
-    mf = load_manifest()
-    entry = mf.setdefault(base, {})
-    entry[stage] = status
-    if extra:
-        entry.update(extra)
-    entry["last_update"] = time.strftime("%Y-%m-%dT%H:%M:%S")
-    save_manifest(mf)
-
-
-def set_stage(mf: dict, base: str, stage: str, status: str):
-    """
-    Updates status inline (when mf is already loaded).
-    """
-    entry = mf.setdefault(base, {})
-    entry[stage] = status
-    entry["last_update"] = time.strftime("%Y-%m-%dT%H:%M:%S")
-    save_manifest(mf)
-
-
+# manifesto.py
+import atexit
+import copy
+import json
+import os
+import signal
+import threading
+import time
+
+from contextlib import contextmanager
+from pathlib import Path
+from .locking import atomic_write_text, file_lock
+from .manifest_archive import ManifestArchive
+from .manifest_entry import PATH_FIELDS, ManifestEntry, as_raw, clone_raw
+from .manifest_events import publish, stage_transitions
+from .manifest_index import STAGES, StageIndex
+from .paths import (
+    MANIFEST_PATH,
+    MANIFEST_ARCHIVE_PATH,
+    MANIFEST_DB_PATH,
+    MANIFEST_JOURNAL_PATH,
+    MANIFEST_JOURNAL_HISTORY_PATH,
+)
+
+# Storage backend for the manifest: "json" (manifesto.json, default),
+# "sqlite" (manifesto.db, one row per base, manifesto.json kept as an export) or
+# "journal" (manifesto.json snapshot + append-only manifesto.journal.jsonl).
+MANIFEST_BACKEND = os.getenv("MANIFEST_BACKEND", "json").strip().lower()
+PATH_KEYS = PATH_FIELDS
+# Finished bases (video: done) untouched for this many days are moved to the
+# archive shard at the end of a render run. 0 = only on explicit `archive`.
+ARCHIVE_AFTER_DAYS = float(os.getenv("MANIFEST_ARCHIVE_AFTER_DAYS", "30"))
+MANIFEST_LOCK_PATH = MANIFEST_PATH.with_name(MANIFEST_PATH.name + ".lock")
+
+
+# ==========================
+# CORE LOAD/SAVE
+# ==========================
+def _dump_entry(entry: dict) -> str:
+    return json.dumps(entry, ensure_ascii=False, sort_keys=True)
+
+
+def _file_signature(path: Path):
+    # ctime_ns too: an atomic replace can reuse a freed inode within one mtime tick
+    try:
+        st = path.stat()
+        return (st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
+
+
+@contextmanager
+def manifest_lock(timeout: float = 60.0):
+    """Cross-process lock guarding manifesto.json read-modify-write cycles."""
+    with file_lock(MANIFEST_LOCK_PATH, timeout=timeout):
+        yield
+
+
+class JsonManifestStore:
+    """
+    Whole-file manifesto.json storage (the historical layout).
+    Writes hold the manifest lock and replace the file atomically, so readers
+    never see a truncated file and concurrent stages don't lose updates.
+    The parsed file is cached and only re-parsed when its signature changes.
+    """
+
+    name = "json"
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._cache: dict | None = None
+        self._cache_sig = None
+        self._index: StageIndex | None = None
+        self._index_sig = None
+
+    def read(self) -> dict:
+        """Parsed manifest, shared with the cache. Do not mutate."""
+        sig = _file_signature(self.path)
+        if self._cache is None or sig != self._cache_sig:
+            raw = {}
+            if sig is not None:
+                raw = json.loads(self.path.read_text(encoding="utf-8") or "{}")
+            self._cache, self._cache_sig = raw, sig
+        return self._cache
+
+    def load(self) -> dict:
+        return {base: clone_raw(entry) for base, entry in self.read().items()}
+
+    def save(self, raw: dict):
+        with manifest_lock():
+            atomic_write_text(self.path, json.dumps(raw, indent=2, ensure_ascii=False))
+            self._cache = None
+
+    def apply(self, bases, fn):
+        """
+        Read-modify-write of the given bases. `fn` receives {base: entry} for the
+        bases that exist and may add, change or drop keys for those bases.
+        """
+        with manifest_lock():
+            return self._apply_locked(bases, fn)
+
+    def _apply_locked(self, bases, fn):
+        sig = _file_signature(self.path)
+        raw = dict(self.read())
+        wanted = list(dict.fromkeys(bases))
+        entries = {b: clone_raw(raw[b]) for b in wanted if b in raw}
+        before = {b: _dump_entry(e) for b, e in entries.items()}
+        result = fn(entries)
+        changed = False
+        for b in wanted:
+            if b in entries:
+                if before.get(b) != _dump_entry(entries[b]):
+                    raw[b] = entries[b]
+                    changed = True
+            elif b in raw:
+                del raw[b]
+                changed = True
+        if changed:
+            self.save(raw)
+            new_sig = _file_signature(self.path)
+            self._cache, self._cache_sig = raw, new_sig  # what we just wrote
+            if self._index is not None and self._index_sig == sig:
+                for b in wanted:
+                    self._index.set(b, raw.get(b))
+                self._index_sig = new_sig
+        return result
+
+    def _current_index(self) -> StageIndex:
+        sig = _file_signature(self.path)
+        if self._index is None or self._index_sig != sig:
+            self._index = StageIndex(self.read())
+            self._index_sig = sig
+        return self._index
+
+    def query(self, criteria: dict) -> list[str]:
+        return self._current_index().query(criteria)
+
+    def has(self, base: str) -> bool:
+        return base in self._current_index()
+
+    def get(self, base: str) -> dict | None:
+        entry = self.read().get(base)
+        return clone_raw(entry) if entry is not None else None
+
+
+_STORE = None
+_ARCHIVE = None
+
+
+def get_store():
+    """Return the process-wide manifest store selected by MANIFEST_BACKEND."""
+    global _STORE
+    if _STORE is None:
+        if MANIFEST_BACKEND == "sqlite":
+            from .manifest_sqlite import SqliteManifestStore
+            _STORE = SqliteManifestStore(MANIFEST_DB_PATH, json_path=MANIFEST_PATH)
+        elif MANIFEST_BACKEND == "journal":
+            from .manifest_journal import JournalManifestStore
+            _STORE = JournalManifestStore(
+                MANIFEST_PATH, MANIFEST_JOURNAL_PATH, history_path=MANIFEST_JOURNAL_HISTORY_PATH
+            )
+        else:
+            _STORE = JsonManifestStore(MANIFEST_PATH)
+    return _STORE
+
+
+def get_archive() -> ManifestArchive:
+    """Return the process-wide archive shard (finished bases)."""
+    global _ARCHIVE
+    if _ARCHIVE is None:
+        _ARCHIVE = ManifestArchive(MANIFEST_ARCHIVE_PATH)
+    return _ARCHIVE
+
+
+def load_manifest(include_archived: bool = False) -> dict[str, ManifestEntry]:
+    """
+    {base: ManifestEntry}; path fields come back absolute, resolved on access.
+    Only active work by default; include_archived=True adds the archive shard.
+    """
+    session = _SESSION
+    raw = session.snapshot() if session is not None else get_store().read()
+    if include_archived:
+        raw = {**get_archive().read(), **raw}  # a hot entry shadows its archived copy
+    return {base: ManifestEntry.from_dict(entry) for base, entry in raw.items()}
+
+
+def save_manifest(mf: dict):
+    session = _SESSION
+    if session is not None:
+        session.flush()
+        session.invalidate()
+    get_store().save({base: as_raw(entry) for base, entry in mf.items()})
+
+
+def bases_where(**criteria) -> list[str]:
+    """
+    Bases whose stage statuses match every criterion, in manifest order, e.g.
+    bases_where(images="done", video__ne="done") or audio__in=("pending", "error").
+    Served from a stage -> status -> bases index instead of a full scan.
+    """
+    session = _SESSION
+    if session is not None:
+        return session.index().query(criteria)
+    return get_store().query(criteria)
+
+
+def _has_hot(base: str) -> bool:
+    session = _SESSION
+    if session is not None:
+        return base in session.index()
+    return get_store().has(base)
+
+
+def has_entry(base: str) -> bool:
+    """True if the base is in the manifest or in the archive shard."""
+    return _has_hot(base) or get_archive().has(base)
+
+
+def get_entry(base: str) -> ManifestEntry | None:
+    """One base by name, falling through to the archive shard."""
+    session = _SESSION
+    raw = session.snapshot().get(base) if session is not None else get_store().get(base)
+    if raw is None:
+        raw = get_archive().get(base)
+    return ManifestEntry.from_dict(raw) if raw is not None else None
+
+
+def _store_apply(bases, fn):
+    """store.apply() that publishes the resulting stage transitions once committed."""
+    wanted = list(dict.fromkeys(bases))
+    events = []
+
+    def _apply(entries):
+        before = {b: {s: e.get(s) for s in STAGES} for b, e in entries.items()}
+        result = fn(entries)
+        for b in wanted:
+            if b in entries or b in before:
+                events.extend(stage_transitions(b, before.get(b), entries.get(b)))
+        return result
+
+    result = get_store().apply(wanted, _apply)
+    publish(events)
+    return result
+
+
+def _commit(bases, fn):
+    """Route a raw read-modify-write to the active session (batched) or straight to the store."""
+    session = _SESSION
+    if session is not None:
+        return session.record(bases, fn)
+    return _store_apply(bases, fn)
+
+
+def _unarchive(bases):
+    """
+    Move archived bases that are about to be updated back into the hot manifest
+    (hot copy first, then the archived one is dropped, under one lock).
+    """
+    wanted = [b for b in dict.fromkeys(bases) if not _has_hot(b)]
+    archive = get_archive()
+    if not any(archive.has(b) for b in wanted):
+        return
+    session = _SESSION
+    if session is not None:
+        session.flush()
+    with manifest_lock():
+        store = get_store()
+        restored = {}
+        for b in wanted:
+            entry = archive.get(b)
+            if entry is not None and not store.has(b):
+                restored[b] = entry
+        if restored:
+            def _restore(entries):
+                entries.update(restored)
+
+            _store_apply(list(restored), _restore)
+            archive.remove(list(restored))
+    if session is not None:
+        session.invalidate()
+
+
+def export_manifest_json(path: Path = MANIFEST_PATH) -> Path:
+    """Write the current manifest as plain JSON (for the UI and external tools)."""
+    store = get_store()
+    if isinstance(store, JsonManifestStore) and Path(path) == store.path:
+        return Path(path)
+    if getattr(store, "snapshot_path", None) == Path(path):
+        store.compact()  # the journal snapshot *is* manifesto.json
+        return Path(path)
+    JsonManifestStore(Path(path)).save(store.read())
+    return Path(path)
+
+
+# ==========================
+# HELPERS
+# ==========================
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+# Counters stored with a stage's timing when it finishes (those present in the entry).
+STAGE_ITEMS = {
+    "srt": ("sentences",),
+    "suggestions": ("scenes", "total_suggestions"),
+    "images": ("images_saved",),
+    "timeline": ("scenes",),
+    "video": ("frames", "scenes"),
+}
+
+
+def _statuses(entry) -> dict:
+    return {s: entry.get(s) for s in STAGES}
+
+
+def _stamp_timings(entry, before: dict, now: float):
+    """
+    Record per-stage timing in entry["timings"][stage] for every status that
+    changed: -> in_progress starts the clock, -> done/error stops it and keeps
+    the duration and the stage's item counts.
+    """
+    for stage in STAGES:
+        status = entry.get(stage)
+        if status == before.get(stage) or not isinstance(status, str):
+            continue
+        finished = status == "done" or status.startswith("error")
+        if status != "in_progress" and not finished:
+            continue
+        timings = entry.setdefault("timings", {})
+        timing = dict(timings.get(stage) or {})
+        if status == "in_progress" or "ended" in timing:
+            timing = {}  # new run of the stage
+        if status == "in_progress":
+            timing["started"] = now
+        else:
+            timing["ended"] = now
+            timing["status"] = "done" if status == "done" else "error"
+            if "started" in timing:
+                timing["seconds"] = round(now - timing["started"], 3)
+            items = {
+                k: entry.get(k) for k in STAGE_ITEMS.get(stage, ())
+                if isinstance(entry.get(k), (int, float)) and not isinstance(entry.get(k), bool)
+            }
+            if items:
+                timing["items"] = items
+        timings[stage] = timing
+
+
+def new_entry() -> dict:
+    return {
+        "txt": "ready",          # TXT already in inbox
+        "audio": "pending",
+        "audio_downloaded": "pending", # audio downloaded
+        "srt": "pending",        # subtitle not yet generated
+        "suggestions": "pending",# prompts not yet generated
+        "images": "pending",     # images not yet made
+        "timeline": "pending",   # timeline JSON not yet created
+        "video": "pending",      # final render not yet done
+        "last_update": _now(),
+        "sentences": 0,
+        "scenes": 0,
+        "images_saved": 0,
+        "group_size": 1
+    }
+
+
+def ensure_entry(base: str) -> ManifestEntry:
+    """
+    Creates the base entry if missing and returns it. An archived base counts
+    as existing and stays in the archive (updates restore it).
+    """
+    existing = get_entry(base)
+    if existing is not None:
+        return existing
+
+    def _apply(entries):
+        if base not in entries:
+            entries[base] = new_entry()
+        return ManifestEntry.from_dict(entries[base])
+
+    return _commit([base], _apply)
+
+
+def update_entry(base: str, fn) -> ManifestEntry:
+    """
+    Per-entry read-modify-write: `fn(entry)` mutates the (path-resolved) entry
+    of `base`, created empty if missing, while the store is locked.
+    Returns the updated entry.
+    """
+    _unarchive([base])
+    now = round(time.time(), 3)
+
+    def _apply(entries):
+        entry = ManifestEntry.from_dict(entries.get(base, {}))
+        before = _statuses(entry)
+        fn(entry)
+        _stamp_timings(entry, before, now)
+        entry["last_update"] = _now()
+        entries[base] = entry.to_dict()
+        return entry
+
+    return _commit([base], _apply)
+
+
+def delete_entries(bases) -> int:
+    """Removes the given bases from the manifest and the archive. Returns how many existed."""
+    bases = list(bases)
+
+    def _apply(entries):
+        removed = list(entries)
+        entries.clear()
+        return removed
+
+    removed = set(_commit(bases, _apply))
+    with manifest_lock():
+        archive = get_archive()
+        removed.update(b for b in bases if archive.has(b))
+        archive.remove(bases)
+    return len(removed)
+
+
+def update_stage(base: str, stage: str, status: str, extra: dict | None = None):
+    """
+    Updates the status of a specific stage of the base (and its timing, see
+    _stamp_timings; counters such as scenes/images_saved/frames go in `extra`).
+    """
+    _unarchive([base])
+    now = round(time.time(), 3)
+
+    def _apply(entries):
+        entry = entries.setdefault(base, {})
+        before = _statuses(entry)
+        entry[stage] = status
+        if extra:
+            entry.update(as_raw(extra))
+        _stamp_timings(entry, before, now)
+        entry["last_update"] = _now()
+
+    _commit([base], _apply)
+
+
+def update_stages(updates) -> int:
+    """
+    Bulk update_stage(): applies [(base, stage, status[, extra]), ...] in one
+    read-modify-write, in order. Missing bases start from new_entry().
+    Returns the number of bases touched.
+    """
+    items = []
+    for update in updates:
+        base, stage, status, *rest = update
+        extra = rest[0] if rest else None
+        items.append((base, stage, status, as_raw(extra) if extra else None))
+    if not items:
+        return 0
+    bases = list(dict.fromkeys(base for base, *_ in items))
+    _unarchive(bases)
+    now = round(time.time(), 3)
+
+    def _apply(entries):
+        stamp = _now()
+        for base, stage, status, extra in items:
+            if base not in entries:
+                entries[base] = new_entry()
+            entry = entries[base]
+            before = _statuses(entry)
+            entry[stage] = status
+            if extra:
+                entry.update(extra)
+            _stamp_timings(entry, before, now)
+            entry["last_update"] = stamp
+
+    _commit(bases, _apply)
+    return len(bases)
+
+
+def set_stage(mf: dict, base: str, stage: str, status: str):
+    """
+    Updates status inline (when mf is already loaded).
+    Only the touched entry is written back.
+    """
+    if base not in mf:
+        _unarchive([base])
+        mf[base] = get_entry(base) or ManifestEntry()
+    entry = mf[base]
+    before = _statuses(entry)
+    entry[stage] = status
+    _stamp_timings(entry, before, round(time.time(), 3))
+    entry["last_update"] = _now()
+    raw_entry = as_raw(entry)
+
+    def _apply(entries):
+        entries[base] = copy.deepcopy(raw_entry)
+
+    _commit([base], _apply)
+
+
+def _older_than(entry: dict, cutoff: float) -> bool:
+    try:
+        return time.mktime(time.strptime(entry["last_update"], "%Y-%m-%dT%H:%M:%S")) <= cutoff
+    except (KeyError, TypeError, ValueError):
+        return True  # no usable timestamp: old enough
+
+
+def archive_finished(older_than_days: float = 0, bases=None) -> list[str]:
+    """
+    Move `video: done` entries (optionally only those idle for `older_than_days`,
+    optionally only `bases`) from the manifest into the archive shard.
+    Returns the archived bases.
+    """
+    session = _SESSION
+    if session is not None:
+        session.flush()
+    store, archive = get_store(), get_archive()
+    cutoff = time.time() - older_than_days * 86400
+    moved = {}
+
+    def _move(entries):
+        for b, e in entries.items():
+            if e.get("video") == "done" and (older_than_days <= 0 or _older_than(e, cutoff)):
+                moved[b] = e
+        archive.add(moved)  # archive first: a crash leaves a duplicate, never a loss
+        for b in moved:
+            del entries[b]
+
+    with manifest_lock():
+        finished = store.query({"video": "done"})
+        if bases is not None:
+            wanted = set(bases)
+            finished = [b for b in finished if b in wanted]
+        if finished:
+            store.apply(finished, _move)
+    if session is not None:
+        session.invalidate()
+    return list(moved)
+
+
+def auto_archive() -> list[str]:
+    """Archive pass driven by MANIFEST_ARCHIVE_AFTER_DAYS (no-op when 0)."""
+    if ARCHIVE_AFTER_DAYS <= 0:
+        return []
+    try:
+        moved = archive_finished(older_than_days=ARCHIVE_AFTER_DAYS)
+    except Exception as e:
+        print(f"⚠️ Manifest archive pass failed: {e}")
+        return []
+    if moved:
+        print(f"🗄️ Archived {len(moved)} finished base(s) → {MANIFEST_ARCHIVE_PATH.name}")
+    return moved
+
+
+# ==========================
+# SESSION (batched writes)
+# ==========================
+class ManifestSession:
+    """
+    Keeps the parsed manifest in memory and queues updates, replaying them on
+    the store in one read-modify-write per flush. Queued mutators re-run on
+    fresh data under the store lock, so other processes' writes are kept.
+    Stage transitions are stamped when recorded and published on flush.
+    """
+
+    def __init__(self, flush_interval: float = 2.0, flush_every: int = 50):
+        self.flush_interval = flush_interval
+        self.flush_every = max(1, flush_every)
+        self._lock = threading.RLock()
+        self._raw: dict | None = None
+        self._index: StageIndex | None = None
+        self._pending: list[tuple[list[str], object]] = []
+        self._events: list[dict] = []  # stage transitions, stamped when recorded
+        self._timer: threading.Timer | None = None
+        self.flushes = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            if self._raw is None:
+                self._raw = get_store().load()
+            return self._raw
+
+    def index(self) -> StageIndex:
+        with self._lock:
+            if self._index is None:
+                self._index = StageIndex(self.snapshot())
+            return self._index
+
+    def invalidate(self):
+        with self._lock:
+            self._raw = None
+            self._index = None
+
+    def record(self, bases, fn):
+        with self._lock:
+            raw = self.snapshot()
+            wanted = list(dict.fromkeys(bases))
+            entries = {b: raw[b] for b in wanted if b in raw}
+            before = {b: _statuses(e) for b, e in entries.items()}
+            result = fn(entries)
+            for b in wanted:
+                if b in entries:
+                    raw[b] = entries[b]
+                else:
+                    raw.pop(b, None)
+                if self._index is not None:
+                    self._index.set(b, raw.get(b))
+                if b in before or b in raw:
+                    self._events.extend(stage_transitions(b, before.get(b), raw.get(b)))
+            self._pending.append((wanted, fn))
+            if len(self._pending) >= self.flush_every:
+                self.flush()
+            elif self._timer is None and self.flush_interval > 0:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return result
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            events, self._events = self._events, []
+            bases = list(dict.fromkeys(b for wanted, _ in pending for b in wanted))
+
+            def _replay(entries):
+                for wanted, fn in pending:
+                    sub = {b: entries[b] for b in wanted if b in entries}
+                    fn(sub)
+                    for b in wanted:
+                        if b in sub:
+                            entries[b] = sub[b]
+                        else:
+                            entries.pop(b, None)
+
+            try:
+                get_store().apply(bases, _replay)
+            except BaseException:
+                self._pending = pending + self._pending
+                self._events = events + self._events
+                raise
+            # every transition recorded since the last flush, with its own time
+            publish(events)
+            self.flushes += 1
+            self.invalidate()  # re-read on next access to pick up other writers
+
+
+_SESSION: ManifestSession | None = None
+
+
+def _raise_exit_on_sigterm(signum, frame):
+    # Unwind through manifest_session() so the final flush runs (server /stop sends SIGTERM).
+    raise SystemExit(128 + signum)
+
+
+@contextmanager
+def manifest_session(flush_interval: float = 2.0, flush_every: int = 50):
+    """
+    Batch manifest writes for hot loops. update_stage/update_entry/set_stage/
+    ensure_entry/delete_entries are queued and written together every
+    `flush_interval` seconds, every `flush_every` updates, and on exit
+    (including SIGTERM). Nested sessions reuse the outer one.
+    """
+    global _SESSION
+    if _SESSION is not None:
+        yield _SESSION
+        return
+
+    session = ManifestSession(flush_interval=flush_interval, flush_every=flush_every)
+    _SESSION = session
+    atexit.register(session.flush)
+    previous = None
+    in_main = threading.current_thread() is threading.main_thread()
+    if in_main and hasattr(signal, "SIGTERM"):
+        previous = signal.signal(signal.SIGTERM, _raise_exit_on_sigterm)
+    try:
+        yield session
+    finally:
+        _SESSION = None
+        try:
+            session.flush()
+        finally:
+            atexit.unregister(session.flush)
+            if in_main and previous is not None:
+                signal.signal(signal.SIGTERM, previous)
+
+
+# ==========================
+# CLI
+# ==========================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manifest maintenance.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_p = sub.add_parser("export", help="Write the manifest as JSON.")
+    export_p.add_argument("--out", type=Path, default=MANIFEST_PATH)
+    sub.add_parser("compact", help="Fold the journal into a fresh snapshot (journal backend).")
+    archive_p = sub.add_parser("archive", help="Move finished bases (video: done) to the archive shard.")
+    archive_p.add_argument("--days", type=float, default=0, help="Only bases idle for this many days.")
+    archive_p.add_argument("--base", action="append", help="Only these bases (repeatable).")
+    replay_p = sub.add_parser("replay", help="Print journal records, oldest first (journal backend).")
+    replay_p.add_argument("--base", help="Only records for this base.")
+    replay_p.add_argument("--no-history", action="store_true", help="Skip compacted history.")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        out = export_manifest_json(args.out)
+        print(f"🧾 Manifest exported ({get_store().name}) → {out}")
+    elif args.command == "archive":
+        moved = archive_finished(older_than_days=args.days, bases=args.base)
+        print(f"🗄️ Archived {len(moved)} base(s) → {MANIFEST_ARCHIVE_PATH} ({len(get_archive())} total)")
+    elif args.command in ("compact", "replay"):
+        store = get_store()
+        if not hasattr(store, "compact"):
+            raise SystemExit(f"❌ '{args.command}' needs MANIFEST_BACKEND=journal (current: {store.name})")
+        if args.command == "compact":
+            folded = store.compact()
+            print(f"🧾 Journal compacted ({folded} bytes folded) → {store.snapshot_path}")
+        else:
+            for rec in store.iter_records(include_history=not args.no_history):
+                if args.base and rec.get("base") != args.base:
+                    continue
+                print(json.dumps(rec, ensure_ascii=False))
@@ -0,0 +1,219 @@
+"""Media durations and image sizes read from file headers only (no decoding, no ffprobe)."""
+from __future__ import annotations
+
+import os
+import struct
+from pathlib import Path
+
+# ======================
+# MP4
+# ======================
+def mp4_duration(path: Path) -> float | None:
+    """Duration from the mp4 movie header (mvhd); only box headers are read."""
+    try:
+        with open(path, "rb") as f:
+            end = os.fstat(f.fileno()).st_size
+            while f.tell() + 8 <= end:
+                start = f.tell()
+                size, kind = struct.unpack(">I4s", f.read(8))
+                if size == 1:
+                    size = struct.unpack(">Q", f.read(8))[0]
+                elif size == 0:
+                    size = end - start
+                if kind == b"moov":
+                    end = start + size  # descend: mvhd is a direct child of moov
+                    continue
+                if kind == b"mvhd":
+                    version = f.read(4)[0]
+                    if version == 1:
+                        timescale, duration = struct.unpack(">16xIQ", f.read(28))
+                    else:
+                        timescale, duration = struct.unpack(">8xII", f.read(16))
+                    return duration / timescale if timescale else None
+                if size < 8:
+                    return None
+                f.seek(start + size)
+    except (OSError, struct.error, IndexError):
+        return None
+    return None
+
+# ======================
+# MP3
+# ======================
+# kbit/s by [MPEG-1?][layer][index]
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_SCAN_BYTES = 64 * 1024  # how far past the tags to look for the first frame
+
+
+def _frame_header(b: bytes):
+    """(bitrate bps, sample rate, samples/frame, frame bytes, mpeg1, mono) or None."""
+    if len(b) < 4 or b[0] != 0xFF or (b[1] & 0xE0) != 0xE0:
+        return None
+    version, layer_bits = (b[1] >> 3) & 3, (b[1] >> 1) & 3
+    br_idx, sr_idx, pad = b[2] >> 4, (b[2] >> 2) & 3, (b[2] >> 1) & 1
+    if version == 1 or layer_bits == 0 or br_idx in (0, 15) or sr_idx == 3:
+        return None
+    mpeg1, layer = version == 3, 4 - layer_bits
+    bitrate = _BITRATES[(mpeg1, layer)][br_idx] * 1000
+    rate = _SAMPLE_RATES[version][sr_idx]
+    if layer == 1:
+        samples, size = 384, (12 * bitrate // rate + pad) * 4
+    else:
+        samples = 1152 if (layer == 2 or mpeg1) else 576
+        size = samples // 8 * bitrate // rate + pad
+    return bitrate, rate, samples, size, mpeg1, (b[3] >> 6) == 3
+
+
+def _id3v2_size(head: bytes) -> int:
+    if len(head) < 10 or head[:3] != b"ID3":
+        return 0
+    size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+    return 10 + size + (10 if head[5] & 0x10 else 0)
+
+
+def mp3_duration(path: Path) -> float | None:
+    """
+    Duration of an mp3 from its headers: the Xing/Info (minus LAME's encoder
+    delay and padding) or VBRI frame count when the encoder wrote one, else
+    size / bitrate of the first frame. Reads at most 64 KB.
+    """
+    try:
+        with open(path, "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            offset = 0
+            while True:  # skip (possibly stacked) ID3v2 tags
+                f.seek(offset)
+                skip = _id3v2_size(f.read(10))
+                if not skip:
+                    break
+                offset += skip
+            f.seek(offset)
+            buf = f.read(_SCAN_BYTES)
+            f.seek(max(0, file_size - 128))
+            audio_end = file_size - (128 if f.read(3) == b"TAG" else 0)
+    except OSError:
+        return None
+
+    for i in range(len(buf) - 4):
+        hdr = _frame_header(buf[i:i + 4])
+        if hdr is None:
+            continue
+        bitrate, rate, samples, size, mpeg1, mono = hdr
+        nxt = buf[i + size:i + size + 4]
+        if len(nxt) == 4 and _frame_header(nxt) is None:
+            continue  # false sync inside tag padding or data
+        frame = buf[i:i + size]
+        side = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+        xing = frame[4 + side:]
+        if xing[:4] in (b"Xing", b"Info") and len(xing) >= 12:
+            flags = struct.unpack(">I", xing[4:8])[0]
+            if flags & 1:
+                frames = struct.unpack(">I", xing[8:12])[0]
+                # LAME extension: encoder delay + end padding (gapless length)
+                pos = 8 + 4 * bool(flags & 1) + 4 * bool(flags & 2) + 100 * bool(flags & 4) + 4 * bool(flags & 8)
+                lame = xing[pos:pos + 24]
+                trim = 0
+                if len(lame) == 24 and lame[:4] in (b"LAME", b"Lavf", b"Lavc"):
+                    trim = (lame[21] << 4 | lame[22] >> 4) + ((lame[22] & 0x0F) << 8 | lame[23])
+                return max(0, frames * samples - trim) / rate
+        vbri = frame[36:36 + 18]
+        if vbri[:4] == b"VBRI":
+            frames = struct.unpack(">I", vbri[14:18])[0]
+            return frames * samples / rate
+        return (audio_end - offset - i) * 8 / bitrate
+    return None
+
+# ======================
+# IMAGES
+# ======================
+_PNG_SIG = b"\x89PNG\r\n\x1a\n"
+# start-of-frame markers (C4 = DHT, C8 = JPG extension, CC = DAC are not frames)
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _exif_transposed(exif: bytes) -> bool:
+    """True when the EXIF orientation rotates by 90° (decoders then swap width and height)."""
+    if exif[:6] != b"Exif\0\0" or len(exif) < 14:
+        return False
+    tiff = exif[6:]
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None:
+        return False
+    ifd = struct.unpack(order + "I", tiff[4:8])[0]
+    if ifd + 2 > len(tiff):
+        return False
+    count = struct.unpack(order + "H", tiff[ifd:ifd + 2])[0]
+    for k in range(count):
+        entry = tiff[ifd + 2 + 12 * k:ifd + 14 + 12 * k]
+        if len(entry) < 12:
+            break
+        if struct.unpack(order + "H", entry[:2])[0] == 0x0112:
+            return struct.unpack(order + "H", entry[8:10])[0] in (5, 6, 7, 8)
+    return False
+
+
+def _jpeg_size(f) -> tuple[int, int] | None:
+    transposed = False
+    while True:
+        b = f.read(1)
+        while b and b != b"\xff":
+            b = f.read(1)  # entropy-coded data or garbage between segments
+        while b == b"\xff":
+            b = f.read(1)  # fill bytes
+        if not b:
+            return None
+        marker = b[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            continue  # standalone markers carry no length
+        if marker == 0xD9:
+            return None  # end of image before any frame header
+        length = struct.unpack(">H", f.read(2))[0]
+        if length < 2:
+            return None
+        if marker in _JPEG_SOF:
+            h, w = struct.unpack(">xHH", f.read(5))
+            if not w or not h:
+                return None
+            return (h, w) if transposed else (w, h)
+        if marker == 0xE1 and not transposed:
+            transposed = _exif_transposed(f.read(length - 2))
+        else:
+            f.seek(length - 2, 1)
+
+
+def image_size(path) -> tuple[int, int] | None:
+    """
+    (width, height) of a JPEG, PNG or WebP from the headers alone, as OpenCV
+    decodes it (a JPEG's EXIF rotation included). None when the file is missing,
+    empty, of another format or its header is damaged.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(30)
+            if head[:2] == b"\xff\xd8":
+                f.seek(2)
+                return _jpeg_size(f)
+            if head[:8] == _PNG_SIG and head[12:16] == b"IHDR":
+                w, h = struct.unpack(">II", head[16:24])
+                return (w, h) if w and h else None
+            if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+                kind = head[12:16]
+                if kind == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+                    w, h = struct.unpack("<HH", head[26:30])
+                    return w & 0x3FFF, h & 0x3FFF
+                if kind == b"VP8L" and head[20] == 0x2F:
+                    bits = int.from_bytes(head[21:25], "little")
+                    return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+                if kind == b"VP8X":
+                    return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+    except (OSError, TypeError, struct.error, IndexError):
+        return None
+    return None
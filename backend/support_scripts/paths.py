@@ -17,6 +17,11 @@ SCRIPTS_ROOT.mkdir(parents=True, exist_ok=True)
 
 # Shared files
 MANIFEST_PATH = ROOT / "manifesto.json"
+MANIFEST_DB_PATH = ROOT / "manifesto.db"
+MANIFEST_JOURNAL_PATH = ROOT / "manifesto.journal.jsonl"
+MANIFEST_JOURNAL_HISTORY_PATH = ROOT / "manifesto.journal.history.jsonl.gz"
+MANIFEST_EVENTS_PATH = ROOT / "manifesto.events.jsonl"
+MANIFEST_ARCHIVE_PATH = ROOT / "manifesto.archive.json.gz"
 
 # Text/script stages
 TXT_INBOX_DIR = ROOT / "txt_inbox"
@@ -32,6 +37,8 @@ SCRIPTS_RENDER_DIR = SCRIPTS_ROOT / "render_output"
 IMG_OUTPUT_DIR = OUTPUT_ROOT / "imgs_output"
 VIDEO_OUTPUT_DIR = OUTPUT_ROOT / "videos"
 RENDER_OUTPUT_DIR = OUTPUT_ROOT / "render_output"
+RENDER_CACHE_DIR = OUTPUT_ROOT / "render_cache"
+RENDER_PREVIEW_DIR = OUTPUT_ROOT / "render_preview"
 AUDIO_OUTPUT_DIR = OUTPUT_ROOT / "audio"
 COMMENTS_OUTPUT_DIR = OUTPUT_ROOT / "comments"
 
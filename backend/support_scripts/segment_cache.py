@@ -0,0 +1,113 @@
+"""Content-addressed store of encoded scene segments, so re-renders only encode what changed."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from .locking import atomic_write_text
+
+_CHUNK = 1 << 20
+# Salted into every key: bump it when the way segments are encoded changes
+# (filters, codec arguments, frame layout), so old segments are not reused.
+FORMAT_VERSION = 2
+# Start of this render run, inherited by the spawned --jobs workers through the
+# environment. prune() keeps whatever the run touched: another job may be about to join it.
+RUN_STARTED = float(os.environ.setdefault("RENDER_RUN_STARTED", str(time.time())))
+
+
+def file_digest(path) -> str:
+    """Hash of a file's bytes ("missing" when it is absent or empty)."""
+    try:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(_CHUNK), b""):
+                h.update(block)
+        return h.hexdigest() if os.path.getsize(path) else "missing"
+    except (OSError, TypeError):
+        return "missing"
+
+
+class SegmentCache:
+    """
+    <root>/<k[:2]>/<k>.mp4 per key. Entries are written atomically (temp file +
+    rename), so parallel renders can share the directory; hits refresh the
+    mtime, which prune() uses as the LRU order.
+    """
+
+    def __init__(self, root: Path, max_mb: int = 0, keep_since: float = RUN_STARTED):
+        self.root = Path(root)
+        self.max_bytes = max(0, max_mb) * 1024 * 1024
+        self.keep_since = keep_since
+
+    @staticmethod
+    def key(**parts) -> str:
+        blob = json.dumps({**parts, "format": FORMAT_VERSION}, sort_keys=True, separators=(",", ":"))
+        return hashlib.blake2b(blob.encode("utf-8"), digest_size=20).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.mp4"
+
+    def get(self, key: str) -> Path | None:
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def temp_path(self, key: str) -> Path:
+        """Where to encode a new entry before put()."""
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.with_name(f".{key}.{os.getpid()}.tmp.mp4")
+
+    def put(self, key: str, tmp: Path) -> Path:
+        path = self.path(key)
+        os.replace(tmp, path)
+        return path
+
+    def record_path(self, label: str) -> Path:
+        return self.root / "renders" / f"{label}.json"
+
+    def has_record(self, label: str) -> bool:
+        """True once `label` (base + variant) has been rendered through the cache."""
+        return self.record_path(label).is_file()
+
+    def record(self, label: str, keys: list[str]):
+        """Remembers the segments of the last cached render of `label`."""
+        path = self.record_path(label)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(path, json.dumps({"keys": keys}))
+
+    def prune(self) -> int:
+        """
+        Deletes least recently used entries above max_mb, except those touched
+        since keep_since (the cache may stay over the cap until the next run).
+        Returns how many were removed.
+        """
+        if not self.max_bytes or not self.root.exists():
+            return 0
+        entries = []
+        for p in self.root.glob("*/*.mp4"):
+            if p.name.startswith("."):
+                continue
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes or mtime >= self.keep_since:
+                break
+            try:
+                p.unlink()
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
@@ -0,0 +1,50 @@
+"""Rate-limited calls: at most one run per interval, and the last request always lands."""
+from __future__ import annotations
+
+import threading
+import time
+
+
+class Throttle:
+    """
+    Runs `fn` at most once every `interval` seconds. A request inside the
+    window is deferred to its end on a daemon timer; flush() runs a deferred
+    request right away (e.g. at exit). `fn` may run on the timer thread.
+    """
+
+    def __init__(self, fn, interval: float):
+        self.fn = fn
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last = float("-inf")
+        self._timer: threading.Timer | None = None
+
+    def __call__(self):
+        with self._lock:
+            if self._timer is not None:
+                return  # a deferred run is already scheduled
+            wait = self._last + self.interval - time.monotonic()
+            if wait > 0:
+                self._timer = threading.Timer(wait, self._fire)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+            self._last = time.monotonic()
+        self.fn()
+
+    def _fire(self):
+        with self._lock:
+            if self._timer is not threading.current_thread():
+                return  # flushed meanwhile
+            self._timer = None
+            self._last = time.monotonic()
+        self.fn()
+
+    def flush(self):
+        with self._lock:
+            timer, self._timer = self._timer, None
+            if timer is not None:
+                self._last = time.monotonic()
+        if timer is not None:
+            timer.cancel()
+            self.fn()
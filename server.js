@@ -31,6 +31,64 @@ const broadcast = (data) => {
     });
 };
 
+// Tail manifesto.events.jsonl (written by backend/support_scripts/manifest_events.py)
+// and push every stage transition to the UI as { type: 'manifest', event }.
+const MANIFEST_EVENTS_PATH = path.join(__dirname, 'manifesto.events.jsonl');
+let manifestEventsIno = null;
+let manifestEventsOffset = 0;
+let manifestEventsPending = Buffer.alloc(0);
+
+try {
+    const stat = fs.statSync(MANIFEST_EVENTS_PATH);
+    manifestEventsIno = stat.ino;
+    manifestEventsOffset = stat.size; // only forward events published after startup
+} catch (error) {
+    // File appears with the first published event
+}
+
+const pollManifestEvents = () => {
+    let stat;
+    try {
+        stat = fs.statSync(MANIFEST_EVENTS_PATH);
+    } catch (error) {
+        return;
+    }
+    if (stat.ino !== manifestEventsIno || stat.size < manifestEventsOffset) {
+        // Rotated or truncated: start over on the new file
+        manifestEventsIno = stat.ino;
+        manifestEventsOffset = 0;
+        manifestEventsPending = Buffer.alloc(0);
+    }
+    if (stat.size <= manifestEventsOffset) return;
+
+    const length = stat.size - manifestEventsOffset;
+    const chunk = Buffer.alloc(length);
+    const fd = fs.openSync(MANIFEST_EVENTS_PATH, 'r');
+    try {
+        fs.readSync(fd, chunk, 0, length, manifestEventsOffset);
+    } finally {
+        fs.closeSync(fd);
+    }
+    manifestEventsOffset += length;
+    manifestEventsPending = Buffer.concat([manifestEventsPending, chunk]);
+
+    const lastNewline = manifestEventsPending.lastIndexOf(0x0a);
+    if (lastNewline === -1) return;
+    const complete = manifestEventsPending.subarray(0, lastNewline).toString('utf8');
+    manifestEventsPending = manifestEventsPending.subarray(lastNewline + 1);
+
+    complete.split('\n').forEach(line => {
+        if (!line.trim()) return;
+        try {
+            broadcast({ type: 'manifest', event: JSON.parse(line) });
+        } catch (error) {
+            console.error('Invalid manifest event:', line);
+        }
+    });
+};
+
+setInterval(pollManifestEvents, 500);
+
 wss.on('connection', (ws) => {
     console.log('Client connected to WebSocket');
     ws.send(JSON.stringify({ type: 'info', message: 'Connected to backend terminal' }));
@@ -66,6 +66,7 @@ function App() {
       }
     },
     onOutputFolder: setOutputFolder,
+    onManifestEvent: (evt) => addLog(`📡 ${evt.base}: ${evt.stage} ${evt.old ?? '-'} → ${evt.new ?? '-'}`),
     currentScript
   });
 
@@ -5,6 +5,7 @@ export const useWebSocket = ({
     onProgress,
     onProcessClose,
     onOutputFolder,
+    onManifestEvent,
     currentScript
 }) => {
     useEffect(() => {
@@ -64,6 +65,9 @@ export const useWebSocket = ({
                 } else if (data.type === 'close') {
                     onLog(`Process finished with code ${data.code}`);
                     onProcessClose(data.code);
+                } else if (data.type === 'manifest') {
+                    // Structured stage transition pushed from manifesto.events.jsonl
+                    if (onManifestEvent) onManifestEvent(data.event);
                 }
             } catch (error) {
                 console.error('Error parsing WebSocket message:', error);
@@ -73,5 +77,5 @@ export const useWebSocket = ({
         return () => {
             ws.close();
         };
-    }, [currentScript, onLog, onProgress, onProcessClose, onOutputFolder]);
+    }, [currentScript, onLog, onProgress, onProcessClose, onOutputFolder, onManifestEvent]);
 };